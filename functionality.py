@@ -10,6 +10,9 @@ import random
 import pyperclip
 import os
 from datetime import datetime
+from contextlib import closing
+
+from schemes.common import warehouse
 
 
 MODE = True
@@ -62,6 +65,9 @@ CATEGORIES = [
 ]
 
 
+# seconds a scheme gets before it answers with its best guess (see 'schemes/common/budget.py')
+TIME_LIMIT = 60
+
 SCHEME = SCHEMES[6]
 YEAR = YEARS[10]
 CATEGORY = CATEGORIES[5]
@@ -305,7 +311,7 @@ def generate_election_button(app):
             global GAME_RESULT
             global GAME_URL
 
-            command = f"python schemes/{GAME_SCHEME}.py --election game-files/game-ballots.json"
+            command = f"python schemes/{GAME_SCHEME}.py --election game-files/game-ballots.json --time-limit {TIME_LIMIT}"
             winner = "<ERROR>"
             winner_poster = "posters/AMBIGUOUS.jpg"
             GAME_WINNER_URL = "https://letterboxd.com/film/404-1/"
@@ -564,31 +570,60 @@ def run_election_button(app):
         global WWTAP_WINNER_URL
         global ACTUAL_WINNER
 
-        command = f"python schemes/{SCHEME}.py --election academy-ballots/{CATEGORY}/{YEAR}-{CATEGORY}-ballots.json"
+        # with the warehouse built (see 'schemes/common/warehouse.py') everything is an
+        # indexed lookup and computed results are reused - otherwise read the files
+        use_warehouse = os.path.exists(warehouse.WAREHOUSE)
+
+        # prefer the binary ballot file if it has been converted (see 'schemes/common/binary.py')
+        # and the JSON hasn't changed since - a stale conversion would run the old ballots
+        ballots = f"academy-ballots/{CATEGORY}/{YEAR}-{CATEGORY}-ballots"
+        converted = os.path.exists(f"{ballots}.mrcv") and (
+            not os.path.exists(f"{ballots}.json")
+            or os.path.getmtime(f"{ballots}.mrcv") >= os.path.getmtime(f"{ballots}.json")
+        )
+        ballots += ".mrcv" if converted else ".json"
+        command = f"python schemes/{SCHEME}.py --election {ballots}"
+        if use_warehouse:
+            command = f"python schemes/{SCHEME}.py --academy {CATEGORY} {YEAR}"
+        command += f" --time-limit {TIME_LIMIT}"
         winner = "<ERROR>"
         winner_poster = "posters/AMBIGUOUS.jpg"
-        WWTAP_WINNER_URL = "https://letterboxd.com/film/404-1/"
+        no_link = "https://letterboxd.com/film/404-1/"
+        WWTAP_WINNER_URL = no_link
 
         # if the command fails, we have a runtime error - simply report it and move on
         try:
-            result = subprocess.check_output(command, shell=True, text=True)
-            winner = result.strip()  # trailing whitespace for some reason?
+            stored = None
+            if use_warehouse:
+                with closing(warehouse.connect()) as conn:
+                    stored = warehouse.result(conn, CATEGORY, int(YEAR), SCHEME)
+
+            if stored is not None:
+                winner = stored[0] if stored[1] else "<AMBIGUOUS>"
+            else:
+                result = subprocess.check_output(command, shell=True, text=True)
+                winner = result.strip()  # trailing whitespace for some reason?
 
             # go and get the winning movie's poster
             if winner != "<AMBIGUOUS>":
-                with open(
-                    f"academy-scraping/{CATEGORY}/{YEAR}-{CATEGORY}.json",
-                    "r",
-                    encoding="utf-8",
-                ) as jsonf:
-                    candidates = json.load(jsonf)
-                    film_url = next(
-                        (
-                            film["url"]
-                            for film in candidates
-                            if film["Film_title"] == winner
+                if use_warehouse:
+                    with closing(warehouse.connect()) as conn:
+                        film = warehouse.film(conn, CATEGORY, int(YEAR), winner)
+                    film_url = no_link if film is None or film.url is None else film.url
+                else:
+                    with open(
+                        f"academy-scraping/{CATEGORY}/{YEAR}-{CATEGORY}.json",
+                        "r",
+                        encoding="utf-8",
+                    ) as jsonf:
+                        candidates = json.load(jsonf)
+                        film_url = next(
+                            (
+                                film["url"]
+                                for film in candidates
+                                if film["Film_title"] == winner
+                            )
                         )
-                    )
 
                 # https://stackoverflow.com/questions/73803684/trying-to-scrape-posters-from-letterboxd-python
                 filmget = requests.get(film_url)
@@ -622,31 +657,37 @@ def run_election_button(app):
         WINNER.configure(text=winner, image=winner_image)
 
         # update academy's results
-        with open(
-            f"academy-scraping/{CATEGORY}/oscar-winners-{CATEGORY}.json",
-            "r",
-            encoding="utf-8",
-        ) as jsonf:
-            ceremonies = json.load(jsonf)
-            actual_winner = next(
-                (
-                    ceremony["winner"]
-                    for ceremony in ceremonies
-                    if str(ceremony["year"]) == YEAR
+        if use_warehouse:
+            with closing(warehouse.connect()) as conn:
+                actual_winner, actual_nominees_list = warehouse.ceremony(
+                    conn, CATEGORY, int(YEAR)
+                )
+        else:
+            with open(
+                f"academy-scraping/{CATEGORY}/oscar-winners-{CATEGORY}.json",
+                "r",
+                encoding="utf-8",
+            ) as jsonf:
+                ceremonies = json.load(jsonf)
+                actual_winner = next(
+                    (
+                        ceremony["winner"]
+                        for ceremony in ceremonies
+                        if str(ceremony["year"]) == YEAR
+                    )
                 )
-            )
 
-            actual_nominees_list = next(
-                (
-                    ceremony["nominees"]
-                    for ceremony in ceremonies
-                    if str(ceremony["year"]) == YEAR
+                actual_nominees_list = next(
+                    (
+                        ceremony["nominees"]
+                        for ceremony in ceremonies
+                        if str(ceremony["year"]) == YEAR
+                    )
                 )
-            )
 
-            actual_nominees = "Actual Nominees:\n"
-            for actual_nominee in actual_nominees_list:
-                actual_nominees += actual_nominee + "\n"
+        actual_nominees = "Actual Nominees:\n"
+        for actual_nominee in actual_nominees_list:
+            actual_nominees += actual_nominee + "\n"
 
         ACTUAL_WINNER.configure(text=f"Actual Winner: \n{actual_winner}")
         ACTUAL_NOMINEES.configure(text=actual_nominees)
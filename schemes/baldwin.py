@@ -6,6 +6,8 @@ from typing import Hashable
 
 from common.types import Ballot, Result, Scheme
 from common.shared_main import shared_main
+from common import budget
+from common.profile import interned, CandidateBallots, candidates_of, remove_candidate
 
 
 # todd's borda - modifed to calculate average and return candidates at or below
@@ -27,26 +29,17 @@ def borda(ballots: list[Ballot]) -> list[Hashable]:
 
 # modified candidate removal from irv - remove candidate with lowest borda score
 def remove_loser(ballots: list[Ballot], loser: Hashable) -> list[Ballot]:
-    new_ballots: list[Ballot] = []
-    for ballot in ballots:
-        if loser in ballot.ranking:
-            temporary: list[Hashable] = list(ballot.ranking)
-            temporary.remove(loser)
-
-            if len(temporary) != 0:
-                new_ballot: Ballot = Ballot(tuple(temporary), ballot.tally)
-                new_ballots.append(new_ballot)
-        else:
-            new_ballots.append(ballot)
+    new_ballots: CandidateBallots = remove_candidate(ballots, loser)
 
     return new_ballots
 
 
 # baldwin's method main - call borda as long as more than one candidate exists
 def baldwin(ballots: list[Ballot]) -> Result:
-    num_candidates: int = len(set(c for ballot in ballots for c in ballot.ranking))
+    num_candidates: int = len(candidates_of(ballots))
     to_eliminate: list[Hashable] = []
     while num_candidates > 1:
+        budget.check(progress=f"{num_candidates} candidates left")
         to_eliminate = borda(ballots)
 
         # tie - for first or last
@@ -57,11 +50,11 @@ def baldwin(ballots: list[Ballot]) -> Result:
 
         num_candidates -= len(to_eliminate)
 
-    winners: list[Hashable] = list(set(c for ballot in ballots for c in ballot.ranking))
+    winners: list[Hashable] = list(candidates_of(ballots))
     return winners[0], len(winners) == 1
 
 
-scheme: Scheme = baldwin
+scheme: Scheme = interned(baldwin)
 name: str = "Baldwin's Method"
 
 
@@ -1,34 +1,13 @@
 # Black's Method - implemented by Jonathan Houge
 # pyright: strict
 
-from collections import Counter
-from typing import Hashable, Iterator
-import itertools
+from typing import Hashable
 
 from common.types import Ballot, Result, Scheme
 from common.shared_main import shared_main
-
-
-# get all candidates
-def total_candidates(ballots: list[Ballot]) -> list[Hashable]:
-    candidates_set: set[Hashable] = set()
-    for ballot in ballots:
-        for candidate in ballot.ranking:
-            candidates_set.add(candidate)
-
-    return list(candidates_set)
-
-
-# initialize pairwise comparison matrix with 0 in every entry
-def matrix_creation(candidates: list[Hashable]) -> list[list[int]]:
-    matrix: list[list[int]] = []
-    for _ in range(0, len(candidates)):
-        row: list[int] = []
-        for _ in range(0, len(candidates)):
-            row.append(0)
-        matrix.append(row)
-
-    return matrix
+from common.profile import interned, candidates_of
+from common.pairwise import majority_graph, borda_scores
+from common.summary import ProfileSummary, SummaryScheme
 
 
 # find condorcet winner - winner will have wins == candidate count - 1
@@ -46,54 +25,40 @@ def condorcet_winner(candidates: list[Hashable], matrix: list[list[int]]) -> Has
 
 # find condorcet winner, if there is one (used whenever a condorcet matrix is needed to be made)
 def condorcet_calculator(ballots: list[Ballot]) -> Hashable:
-    candidates: list[Hashable] = total_candidates(ballots)
-    matrix: list[list[int]] = matrix_creation(candidates)
-
-    combinations: Iterator[tuple[Hashable, ...]] = itertools.combinations(candidates, 2)
-    for combination in combinations:
-        votes: list[int] = [0, 0]
-        for ballot in ballots:
-            c1_present: int = ballot.ranking.count(combination[0])
-            c2_present: int = ballot.ranking.count(combination[1])
-
-            if c1_present and not c2_present:
-                votes[0] += ballot.tally
-            elif not c1_present and c2_present:
-                votes[1] += ballot.tally
-            elif c1_present and c2_present:
-                c1_position: int = ballot.ranking.index(combination[0])
-                c2_position: int = ballot.ranking.index(combination[1])
-                if c1_position < c2_position:
-                    votes[0] += ballot.tally
-                elif c1_position > c2_position:
-                    votes[1] += ballot.tally
-
-        c1: int = candidates.index(combination[0])
-        c2: int = candidates.index(combination[1])
-        if votes[0] > votes[1]:
-            matrix[c2][c1] = 0
-            matrix[c1][c2] = 1
-        elif votes[1] > votes[0]:
-            matrix[c1][c2] = 0
-            matrix[c2][c1] = 1
-        else:
-            matrix[c1][c2] = 0
-            matrix[c2][c1] = 0
+    candidates: list[Hashable] = list(candidates_of(ballots))
+    return condorcet_winner(candidates, majority_graph(ballots, candidates))
+
+
+# the same from a pairwise matrix (see 'black_summary')
+def condorcet_from_matrix(candidates: list[Hashable], votes: list[list[int]]) -> Hashable:
+    matrix: list[list[int]] = [
+        [1 if votes[i][j] > votes[j][i] else 0 for j in range(len(candidates))]
+        for i in range(len(candidates))
+    ]
 
     return condorcet_winner(candidates, matrix)
 
 
 # todd's borda
 def borda(ballots: list[Ballot]) -> Result:
-    size: int = len(set(c for ballot in ballots for c in ballot.ranking))
-    points: list[int] = [c for c in range(size - 1, -1, -1)]
-    scores: Counter[Hashable] = Counter()
-    for ballot in ballots:
-        for i, candidate in enumerate(ballot.ranking):
-            scores[candidate] += points[i] * ballot.tally
-    max_score: int = max(scores.values())
+    candidates: list[Hashable] = list(candidates_of(ballots))
+    scores: list[int] = borda_scores(ballots, candidates)
+    max_score: int = max(scores)
     winners: list[Hashable] = [
-        candidate for candidate, score in scores.items() if score == max_score
+        candidate for candidate, score in zip(candidates, scores) if score == max_score
+    ]
+    return winners[0], len(winners) == 1
+
+
+# todd's borda from the rank counts - 'positions[c][k]' votes rank candidates[c] k-th
+def borda_from_positions(candidates: list[Hashable], positions: list[list[int]]) -> Result:
+    points: list[int] = [c for c in range(len(candidates) - 1, -1, -1)]
+    scores: list[int] = [
+        sum(p * votes for p, votes in zip(points, row)) for row in positions
+    ]
+    max_score: int = max(scores)
+    winners: list[Hashable] = [
+        candidate for candidate, score in zip(candidates, scores) if score == max_score
     ]
     return winners[0], len(winners) == 1
 
@@ -107,12 +72,22 @@ def black(ballots: list[Ballot]) -> Result:
         return condorcet_winner, True
 
 
-scheme: Scheme = black
+def black_summary(summary: ProfileSummary) -> Result:
+    winner: Hashable = condorcet_from_matrix(summary.candidates, summary.pairwise)
+
+    if winner is None:
+        return borda_from_positions(summary.candidates, summary.positions)
+    else:
+        return winner, True
+
+
+scheme: Scheme = interned(black)
+summary_scheme: SummaryScheme = black_summary
 name: str = "Black"
 
 
 def main() -> None:
-    print(shared_main("black", scheme))
+    print(shared_main("black", scheme, summary_scheme))
 
 
 if __name__ == "__main__":
@@ -1,33 +1,47 @@
-from collections import Counter
 from typing import Hashable
 
 from common.types import Ballot, Result, Scheme
 from common.shared_main import shared_main
+from common.profile import interned, candidates_of
+from common.summary import ProfileSummary, SummaryScheme
+from common.pairwise import borda_scores
 
 
 # borda count depends on the size of the ballot,
 # so we will use the length of the longest ballot
 # (a completely arbitrary choice)
 def borda(ballots: list[Ballot]) -> Result:
-    size: int = len(set(c for ballot in ballots for c in ballot.ranking))
-    points: list[int] = [c for c in range(size - 1, -1, -1)]
-    scores: Counter[Hashable] = Counter()
-    for ballot in ballots:
-        for i, candidate in enumerate(ballot.ranking):
-            scores[candidate] += points[i] * ballot.tally
-    max_score: int = max(scores.values())
+    candidates: list[Hashable] = list(candidates_of(ballots))
+    scores: list[int] = borda_scores(ballots, candidates)
+    max_score: int = max(scores)
     winners: list[Hashable] = [
-        candidate for candidate, score in scores.items() if score == max_score
+        candidate for candidate, score in zip(candidates, scores) if score == max_score
     ]
     return winners[0], len(winners) == 1
 
 
-scheme: Scheme = borda
+# the same count from a summary's rank counts
+def borda_summary(summary: ProfileSummary) -> Result:
+    points: list[int] = [c for c in range(len(summary.candidates) - 1, -1, -1)]
+    scores: list[int] = [
+        sum(p * votes for p, votes in zip(points, row)) for row in summary.positions
+    ]
+    max_score: int = max(scores)
+    winners: list[Hashable] = [
+        candidate
+        for candidate, score in zip(summary.candidates, scores)
+        if score == max_score
+    ]
+    return winners[0], len(winners) == 1
+
+
+scheme: Scheme = interned(borda)
+summary_scheme: SummaryScheme = borda_summary
 name: str = "Borda Count"
 
 
 def main() -> None:
-    print(shared_main("borda", scheme))
+    print(shared_main("borda", scheme, summary_scheme))
 
 
 if __name__ == "__main__":
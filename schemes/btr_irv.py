@@ -6,16 +6,8 @@ from typing import Hashable
 
 from common.types import Ballot, Result, Scheme
 from common.shared_main import shared_main
-
-
-# get all candidates
-def total_candidates(ballots: list[Ballot]) -> list[Hashable]:
-    candidates_set: set[Hashable] = set()
-    for ballot in ballots:
-        for candidate in ballot.ranking:
-            candidates_set.add(candidate)
-
-    return list(candidates_set)
+from common.profile import interned, CandidateBallots, candidates_of, remove_candidate
+from common.pairwise import PairwiseMatrix
 
 
 # count all votes - make sure those that have zero are counted too
@@ -32,23 +24,10 @@ def count_votes(candidates: list[Hashable], ballots: list[Ballot]) -> Counter[Ha
     return votes
 
 
-def face_off(ballots: list[Ballot], losers: list[Hashable]) -> Hashable:
-    votes: list[int] = [0, 0]
-    for ballot in ballots:
-        c1_present: int = ballot.ranking.count(losers[0])
-        c2_present: int = ballot.ranking.count(losers[1])
-
-        if c1_present and not c2_present:
-            votes[0] += ballot.tally
-        elif not c1_present and c2_present:
-            votes[1] += ballot.tally
-        elif c1_present and c2_present:
-            c1_position: int = ballot.ranking.index(losers[0])
-            c2_position: int = ballot.ranking.index(losers[1])
-            if c1_position < c2_position:
-                votes[0] += ballot.tally
-            elif c1_position > c2_position:
-                votes[1] += ballot.tally
+# head-to-head between the bottom two - eliminations don't change it, so it's read off the
+# pairwise matrix of the original ballots (see 'pairwise.PairwiseMatrix')
+def face_off(matrix: PairwiseMatrix, losers: list[Hashable]) -> Hashable:
+    votes: list[int] = [matrix[losers[0], losers[1]], matrix[losers[1], losers[0]]]
 
     if votes[0] > votes[1]:
         return losers[1]
@@ -62,23 +41,14 @@ def face_off(ballots: list[Ballot], losers: list[Hashable]) -> Hashable:
 def remove_loser(
     candidates: list[Hashable], ballots: list[Ballot], loser: Hashable
 ) -> list[Ballot]:
-    new_ballots: list[Ballot] = []
-    for ballot in ballots:
-        if loser in ballot.ranking:
-            temporary: list[Hashable] = list(ballot.ranking)
-            temporary.remove(loser)
-            if len(temporary) != 0:
-                new_ballot: Ballot = Ballot(tuple(temporary), ballot.tally)
-                new_ballots.append(new_ballot)
-        else:
-            new_ballots.append(ballot)
-
+    new_ballots: CandidateBallots = remove_candidate(ballots, loser, merge=True)
     candidates.remove(loser)
     return new_ballots
 
 
 def btr_irv(ballots: list[Ballot]) -> Result:
-    candidates: list[Hashable] = total_candidates(ballots)
+    candidates: list[Hashable] = list(candidates_of(ballots))
+    matrix: PairwiseMatrix = PairwiseMatrix.of(ballots, candidates)
 
     winners: list[Hashable]
     losers: list[Hashable]
@@ -109,18 +79,19 @@ def btr_irv(ballots: list[Ballot]) -> Result:
             winners = losers
             break
         elif len(losers) == 2:
-            loser: Hashable = face_off(ballots, losers)
+            loser: Hashable = face_off(matrix, losers)
             if loser == -1:
                 winners = losers
                 break
             ballots = remove_loser(candidates, ballots, loser)
+            matrix.remove(loser)
         elif len(winners) > 1:
             break
 
     return winners[0], len(winners) == 1
 
 
-scheme: Scheme = btr_irv
+scheme: Scheme = interned(btr_irv)
 name: str = "Bottom-Two-Runoff IRV"
 
 
@@ -6,16 +6,8 @@ from typing import Hashable
 
 from common.types import Ballot, Result, Scheme
 from common.shared_main import shared_main
-
-
-# get all candidates
-def total_candidates(ballots: list[Ballot]) -> list[Hashable]:
-    candidates_set: set[Hashable] = set()
-    for ballot in ballots:
-        for candidate in ballot.ranking:
-            candidates_set.add(candidate)
-
-    return list(candidates_set)
+from common.profile import interned, candidates_of
+from common.summary import ProfileSummary, SummaryScheme
 
 
 # count votes for the passed in ranking index - accounts for incompletes
@@ -28,7 +20,7 @@ def count_votes(votes: Counter[Hashable], ballots: list[Ballot], index: int) ->
 
 # bucklin main - iterate through ballots, index at a time
 def bucklin(ballots: list[Ballot]) -> Result:
-    candidates: list[Hashable] = total_candidates(ballots)
+    candidates: list[Hashable] = list(candidates_of(ballots))
     winners: list[Hashable] = []
 
     total_votes: int = sum(ballot.tally for ballot in ballots)
@@ -48,12 +40,38 @@ def bucklin(ballots: list[Ballot]) -> Result:
     return winners[0], len(winners) == 1
 
 
-scheme: Scheme = bucklin
+# bucklin from a summary - each round adds the next column of the rank counts
+def bucklin_summary(summary: ProfileSummary) -> Result:
+    winners: list[Hashable] = []
+    majority: float = summary.voters * 0.5
+
+    votes: list[int] = [0] * len(summary.candidates)
+    for i in range(0, len(summary.candidates)):
+        for c, row in enumerate(summary.positions):
+            if i < len(row):
+                votes[c] += row[i]
+
+        highest: int = max(votes)
+        winners = [
+            candidate
+            for candidate, score in zip(summary.candidates, votes)
+            if score == highest
+        ]
+
+        # someone has majority
+        if float(highest) > majority:
+            break
+
+    return winners[0], len(winners) == 1
+
+
+scheme: Scheme = interned(bucklin)
+summary_scheme: SummaryScheme = bucklin_summary
 name: str = "Bucklin Voting"
 
 
 def main() -> None:
-    print(shared_main("bucklin", scheme))
+    print(shared_main("bucklin", scheme, summary_scheme))
 
 
 if __name__ == "__main__":
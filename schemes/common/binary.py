@@ -0,0 +1,151 @@
+# Binary ballot files - a 'BallotProfile' laid out so it can be memory-mapped
+# pyright: strict
+#
+# layout (little-endian):
+#   header      magic, version, id width (2 or 4 bytes), # candidates, # ballots, # ids,
+#               candidate table length, winners length
+#   candidates  utf-8 JSON list - the candidate table, id -> name
+#   winners     utf-8 JSON object
+#   offsets     int32 x (# ballots + 1), 4-byte aligned
+#   ids         int16 or int32 x # ids
+#   tallies     int32 x # ballots, 4-byte aligned
+#
+# usage (from 'schemes'): python -m common.binary [election files...]
+# with no files, every '../academy-ballots/*/*.json' is converted
+
+import sys
+import json
+import glob
+import mmap
+import struct
+import argparse
+from array import array
+from typing import Literal, Sequence
+
+from .types import Ballot, Election
+from .profile import BallotProfile
+
+BINARY_EXTENSION: str = ".mrcv"
+MAGIC: bytes = b"MRCV"
+VERSION: int = 1
+HEADER: struct.Struct = struct.Struct("<4sHHIIIII")
+
+
+def is_binary(fname: str) -> bool:
+    return fname.endswith(BINARY_EXTENSION)
+
+
+# pad so the next array starts on a 4-byte boundary
+def padding(position: int) -> int:
+    return -position % 4
+
+
+# arrays are written little-endian whatever the machine is
+def little_endian(values: "array[int]") -> bytes:
+    if sys.byteorder != "little":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def election_to_bytes(election: Election) -> bytes:
+    profile: BallotProfile = BallotProfile.of(election.ballots)
+    id_type: str = "h" if len(profile.candidates) <= 2**15 - 1 else "i"
+
+    candidates: bytes = json.dumps(profile.candidates, ensure_ascii=False).encode("utf-8")
+    winners: bytes = json.dumps(election.winners, ensure_ascii=False).encode("utf-8")
+    header: bytes = HEADER.pack(
+        MAGIC,
+        VERSION,
+        array(id_type).itemsize,
+        len(profile.candidates),
+        len(profile),
+        len(profile.ids),
+        len(candidates),
+        len(winners),
+    )
+
+    chunks: list[bytes] = [header, candidates, winners]
+    position: int = len(header) + len(candidates) + len(winners)
+    chunks.append(b"\0" * padding(position))
+    chunks.append(little_endian(array("i", profile.offsets)))
+    ids: bytes = little_endian(array(id_type, profile.ids))
+    chunks.append(ids)
+    chunks.append(b"\0" * padding(len(ids)))
+    chunks.append(little_endian(array("i", profile.tallies)))
+
+    return b"".join(chunks)
+
+
+def write_binary_election(election: Election, fname: str) -> None:
+    with open(fname, "wb") as f:
+        f.write(election_to_bytes(election))
+
+
+# view 'count' values of 'typecode' at 'position' - no copy unless the machine is big-endian
+def view(
+    buffer: memoryview, position: int, typecode: Literal["h", "i"], count: int
+) -> Sequence[int]:
+    size: int = array(typecode).itemsize
+    values: memoryview = buffer[position : position + size * count]
+    if sys.byteorder == "little":
+        return values.cast(typecode)
+
+    copy: array[int] = array(typecode, values.tobytes())
+    copy.byteswap()
+    return copy
+
+
+# the profile's arrays are views into the mapped file, which stays open while they're used
+def read_binary_election(fname: str) -> Election:
+    with open(fname, "rb") as f:
+        mapped: mmap.mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    buffer: memoryview = memoryview(mapped)
+    magic, version, id_width, _, num_ballots, num_ids, candidates_length, winners_length = (
+        HEADER.unpack_from(buffer)
+    )
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"{fname} is not a version {VERSION} ballot file")
+
+    position: int = HEADER.size
+    candidates = json.loads(bytes(buffer[position : position + candidates_length]))
+    position += candidates_length
+    winners = json.loads(bytes(buffer[position : position + winners_length]))
+    position += winners_length
+    position += padding(position)
+
+    offsets: Sequence[int] = view(buffer, position, "i", num_ballots + 1)
+    position += 4 * (num_ballots + 1)
+    ids: Sequence[int] = view(buffer, position, "h" if id_width == 2 else "i", num_ids)
+    position += id_width * num_ids
+    position += padding(position)
+    tallies: Sequence[int] = view(buffer, position, "i", num_ballots)
+
+    ballots: Sequence[Ballot] = BallotProfile(candidates, offsets, ids, tallies)
+    return Election(ballots, winners)
+
+
+def convert(fname: str) -> str:
+    from .utility import read_election  # here, since 'utility' imports this module
+
+    with open(fname, "r", encoding="utf-8") as f:
+        election: Election = read_election(f, profile=True)
+
+    outname: str = fname.removesuffix(".json") + BINARY_EXTENSION
+    write_binary_election(election, outname)
+    return outname
+
+
+def main():
+    parser = argparse.ArgumentParser(description="convert election files to binary")
+    parser.add_argument("files", nargs="*", help="election files (JSON)")
+    args = parser.parse_args()
+
+    files: list[str] = args.files or sorted(glob.glob("../academy-ballots/*/*.json"))
+    for fname in files:
+        print(f"{fname} -> {convert(fname)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+# Time and work budgets - a scheme run under one checks it cooperatively and stops early
+# pyright: strict
+#
+# a 'Scheme' takes no budget, so the budget is ambient: 'run' makes it current for one call,
+# and the scheme calls 'check' at its round and loop boundaries - with how far it's got and
+# its best guess at the winner so far. outside 'run', 'check' does nothing. once the time or
+# work is spent 'check' raises 'BudgetExceeded', which 'run' turns into an incomplete
+# 'Outcome' with that best guess - not unique, since the scheme never finished.
+#
+# a scheme can also read 'remaining' to fit an anytime search into what's left (see
+# 'kemeny.py'), and still return a full result - 'run' marks it incomplete (and its winner
+# not unique) all the same if anything was cut short. 'shared_main' runs every scheme under
+# 'limit' ('--time-limit'), and never stores a winner from an incomplete run
+
+import time
+from typing import Callable, Hashable, NamedTuple
+
+from .types import Result
+
+# seconds for each election run under 'run' - 'None' for no limit
+limit: float | None = None
+
+
+def set_limit(seconds: float | None) -> None:
+    global limit
+    if seconds is not None and seconds <= 0:
+        raise ValueError(f"time limit must be positive, not {seconds}")
+    limit = seconds
+
+
+class Budget:
+    def __init__(self, seconds: float | None = None, work: int | None = None) -> None:
+        self.start: float = time.perf_counter()
+        self.deadline: float | None = None if seconds is None else self.start + seconds
+        self.work: int | None = work
+        self.spent: int = 0
+        self.checks: int = 0
+        self.progress: str = ""
+        self.best: Hashable = None
+        self.exceeded: bool = False
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.start
+
+    # seconds left, at most 'most'
+    def remaining(self, most: float = float("inf")) -> float:
+        if self.deadline is None:
+            return most
+        return max(0.0, min(most, self.deadline - time.perf_counter()))
+
+    def spend(self, work: int) -> bool:
+        self.spent += work
+        self.checks += 1
+        over: bool = (self.work is not None and self.spent > self.work) or (
+            self.deadline is not None and time.perf_counter() > self.deadline
+        )
+        self.exceeded = self.exceeded or over
+        return over
+
+    def report(self) -> str:
+        where: str = f"{self.progress}, " if self.progress else ""
+        guess: str = f", best so far {self.best}" if self.best is not None else ""
+        return f"{where}{self.spent} work in {self.elapsed():.2f}s{guess}"
+
+
+class BudgetExceeded(Exception):
+    def __init__(self, budget: Budget) -> None:
+        super().__init__(f"budget exceeded - {budget.report()}")
+        self.budget: Budget = budget
+
+
+class Outcome(NamedTuple):
+    result: Result
+    complete: bool
+    progress: str
+
+
+current: Budget | None = None
+last: Outcome | None = None  # what the latest 'run' came to
+
+
+# note progress (and the best guess so far) without spending anything
+def note(progress: str | None = None, best: Hashable = None) -> None:
+    if current is None:
+        return
+    if progress is not None:
+        current.progress = progress
+    if best is not None:
+        current.best = best
+
+
+# spend 'work' from the current budget - raises 'BudgetExceeded' once it's gone
+def check(work: int = 1, progress: str | None = None, best: Hashable = None) -> None:
+    if current is None:
+        return
+    note(progress, best)
+    if current.spend(work):
+        raise BudgetExceeded(current)
+
+
+# seconds left in the current budget, at most 'most'
+def remaining(most: float = float("inf")) -> float:
+    return most if current is None else current.remaining(most)
+
+
+# 'call' under a budget - 'limit' seconds unless one is given
+def run(call: Callable[[], Result], budget: Budget | None = None) -> Outcome:
+    global current, last
+    if budget is None:
+        budget = Budget(limit)
+    outer: Budget | None = current
+    current = budget
+    outcome: Outcome
+    try:
+        result: Result = call()
+        if budget.exceeded:  # finished, but something was cut short on the way
+            result = result[0], False
+        outcome = Outcome(result, not budget.exceeded, budget.report())
+    except BudgetExceeded:
+        outcome = Outcome((budget.best, False), False, budget.report())
+    finally:
+        current = outer
+    last = outcome
+    return outcome
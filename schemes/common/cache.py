@@ -0,0 +1,123 @@
+# On-disk cache of parsed elections, keyed by a hash of the election file's bytes
+# pyright: strict
+#
+# entries are pickled profiles - a hit skips JSON parsing and candidate interning.
+# entries older than 'MAX_AGE' are evicted, then the least recently used ones
+# until the cache is under 'MAX_BYTES'. set 'MRCV_CACHE' to move the cache.
+
+import os
+import json
+import time
+import pickle
+import hashlib
+import tempfile
+from array import array
+from typing import Any, Callable
+
+from .types import Election
+from .profile import BallotProfile
+
+CACHE_DIR: str = os.environ.get(
+    "MRCV_CACHE", os.path.join(os.path.expanduser("~"), ".cache", "mrcv")
+)
+CACHE_VERSION: int = 1
+MAX_BYTES: int = 256 * 1024 * 1024
+MAX_AGE: float = 30 * 24 * 60 * 60  # seconds
+
+
+def cache_key(contents: bytes) -> str:
+    return hashlib.sha256(contents).hexdigest()
+
+
+def cache_path(key: str, directory: str = CACHE_DIR) -> str:
+    return os.path.join(directory, f"{key}.pickle")
+
+
+# 'parse' turns the file's JSON into an election - only called on a miss
+def cached_election(
+    fname: str, parse: Callable[[Any], Election], directory: str = CACHE_DIR
+) -> Election:
+    with open(fname, "rb") as f:
+        contents: bytes = f.read()
+
+    path: str = cache_path(cache_key(contents), directory)
+    election: Election | None = read_entry(path)
+    if election is not None:
+        return election
+
+    election = parse(json.loads(contents))
+    write_entry(path, election)
+    evict(directory)
+    return election
+
+
+# a missing, stale or unreadable entry is a miss
+def read_entry(path: str) -> Election | None:
+    try:
+        with open(path, "rb") as f:
+            version, candidates, offsets, ids, tallies, winners = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, ValueError, TypeError):
+        return None
+    if version != CACHE_VERSION:
+        return None
+
+    os.utime(path)  # mark as recently used
+    return Election(BallotProfile(candidates, offsets, ids, tallies), winners)
+
+
+# written to a temporary file first so readers never see half an entry
+def write_entry(path: str, election: Election) -> None:
+    profile: BallotProfile = BallotProfile.of(election.ballots)
+    entry: tuple[Any, ...] = (
+        CACHE_VERSION,
+        profile.candidates,
+        array("i", profile.offsets),
+        array("i", profile.ids),
+        array("i", profile.tallies),
+        election.winners,
+    )
+
+    directory: str = os.path.dirname(path)
+    try:
+        os.makedirs(directory, exist_ok=True)
+        descriptor, temporary = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(descriptor, "wb") as f:
+            pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary, path)
+    except OSError:
+        pass  # caching is best-effort
+
+
+# drop entries older than 'max_age', then the least recently used over 'max_bytes'
+def evict(
+    directory: str = CACHE_DIR, max_bytes: int = MAX_BYTES, max_age: float = MAX_AGE
+) -> None:
+    now: float = time.time()
+    entries: list[tuple[float, int, str]] = []
+    try:
+        names: list[str] = os.listdir(directory)
+    except OSError:
+        return
+
+    for name in names:
+        if not name.endswith(".pickle"):
+            continue
+        path: str = os.path.join(directory, name)
+        try:
+            stat: os.stat_result = os.stat(path)
+            if now - stat.st_mtime > max_age:
+                os.remove(path)
+            else:
+                entries.append((stat.st_mtime, stat.st_size, path))
+        except OSError:
+            continue
+
+    total: int = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+            total -= size
+        except OSError:
+            continue
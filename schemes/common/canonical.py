@@ -0,0 +1,70 @@
+# Canonical ballot profiles - identical rankings merged, empty ballots dropped
+# pyright: strict
+
+from array import array
+from typing import Hashable, Iterable, NamedTuple, Sequence, TypeVar
+
+from .types import Ballot
+from .profile import BallotProfile, ranked_ballot
+
+T = TypeVar("T", bound=Hashable)
+
+
+# how much a profile shrank when it was canonicalized
+class Shrinkage(NamedTuple):
+    ballots_before: int
+    ballots_after: int
+    duplicates_merged: int
+    empty_dropped: int  # empty rankings or zero tallies
+
+    def __str__(self) -> str:
+        return (
+            f"{self.ballots_before} -> {self.ballots_after} ballots "
+            f"({self.duplicates_merged} duplicates merged, {self.empty_dropped} empty dropped)"
+        )
+
+
+# sum the tallies of identical rankings, skipping empty and zero-tally ballots.
+# returns the merged rankings sorted by tally (highest first) and how many were skipped
+def merge_rankings(
+    rankings: Iterable[tuple[tuple[T, ...], int]]
+) -> tuple[list[tuple[tuple[T, ...], int]], int]:
+    merged: dict[tuple[T, ...], int] = {}
+    empty: int = 0
+    for ranking, tally in rankings:
+        if len(ranking) == 0 or tally == 0:
+            empty += 1
+            continue
+        merged[ranking] = merged.get(ranking, 0) + tally
+
+    # stable, so equal tallies keep the order they were first seen in
+    return sorted(merged.items(), key=lambda item: -item[1]), empty
+
+
+# canonical form of a profile (or list of ballots) and how much it shrank -
+# a profile stays a profile (same candidate ids), a list stays a list
+def canonicalize(ballots: Sequence[Ballot]) -> tuple[Sequence[Ballot], Shrinkage]:
+    if isinstance(ballots, BallotProfile):
+        profile: BallotProfile = ballots
+        ordered_ids, empty = merge_rankings(
+            (profile.ranking(i), profile.tallies[i]) for i in range(len(profile))
+        )
+
+        offsets: array[int] = array("i", [0])
+        ids: array[int] = array("i")
+        tallies: array[int] = array("i")
+        for ranking, tally in ordered_ids:
+            ids.extend(ranking)
+            offsets.append(len(ids))
+            tallies.append(tally)
+
+        canonical: BallotProfile = BallotProfile(profile.candidates, offsets, ids, tallies)
+        return canonical, shrinkage(len(ballots), len(canonical), empty)
+
+    ordered, empty = merge_rankings((ballot.ranking, ballot.tally) for ballot in ballots)
+    merged: list[Ballot] = [ranked_ballot(ranking, tally) for ranking, tally in ordered]
+    return merged, shrinkage(len(ballots), len(merged), empty)
+
+
+def shrinkage(before: int, after: int, empty: int) -> Shrinkage:
+    return Shrinkage(before, after, before - empty - after, empty)
@@ -0,0 +1,576 @@
+# Kemeny-Young - the ranking that agrees with the most head-to-head votes
+# pyright: strict
+#
+# a ranking scores 'votes[i][j]' (see 'pairwise.py') for every pair it puts i above j.
+# trying every permutation is O(C!), so:
+#
+# first the candidates are split into the strongly connected components of 'beats_or_ties'
+# (see 'tournament.py'). every member of an earlier component beats every member of a later
+# one outright, and swapping such a pair only loses votes, so every optimal ranking keeps the
+# components in order - each is solved on its own, and the winner only needs the first.
+# big elections mostly break into a top component or two and a long tail
+#
+# each component is searched branch and bound, best candidate next first, from a greedy
+# ranking. a prefix can't finish above its score plus the larger side of every pair still to
+# place, and two prefixes of the same candidates finish the same way, so only the better one
+# goes on. 'WORK' pairs are looked at before it gives up on a component, which then falls to
+#
+# a dynamic program over bitmasks - the best ranking of a set of candidates is the best
+# ranking of everyone but its last candidate, followed by that candidate:
+#
+#   best[S] = max over c in S of  best[S - c] + sum of votes[d][c] for d in S - c
+#
+# O(2^C * C^2) time and O(2^C) memory - with numpy (see 'vectorized.kemeny_table') about 22
+# candidates fit, in pure python about 18. 'LIMIT' (or 'MRCV_KEMENY_LIMIT') is the most
+# candidates it will try. past it the 'exact' mode raises a ValueError, while 'anytime' (the
+# default) and 'anneal' rank the component by local search for 'seconds' instead:
+#
+#   start   the better of the matrix's borda and copeland orders, after insertion moves
+#   then    'anytime' shuffles short stretches of the best ranking and re-improves it,
+#           'anneal' runs simulated annealing over adjacent swaps (O(1) to score each)
+#
+# an approximate ranking carries a 'bound' no ranking can beat (see 'upper_bound'), so the
+# gap to the optimum is known. set the mode with 'set_mode' or 'MRCV_KEMENY', the budget
+# with 'MRCV_KEMENY_SECONDS'
+#
+# with scipy installed, components of 'ILP_SIZES' go to an integer program first (see
+# 'linear_ordering.py'), which proves mid-sized ones far faster than the search - within
+# 'seconds' too. 'stats' has the time and work each solver took
+#
+# under a budget (see 'budget.py') the exact solvers check it as they go and local search
+# gets whatever's left of it, so an 'anytime' run always answers in time
+#
+# usage (from 'schemes'): python -m common.kemeny [election files...]
+# prints each file's components and kemeny-young ranking
+
+import os
+import math
+import time
+import random
+import argparse
+from typing import Hashable, NamedTuple, Sequence
+
+from .types import Ballot, Result
+from .pairwise import pairwise_matrix, use_numpy
+from .tournament import beats, beats_or_ties, components
+from .variants import copeland_scores
+from . import budget
+from .budget import BudgetExceeded
+
+try:
+    from . import vectorized
+except ImportError:  # numpy is optional
+    vectorized = None
+
+try:
+    from . import linear_ordering
+except ImportError:  # so is scipy
+    linear_ordering = None
+
+LIMIT: int = int(os.environ.get("MRCV_KEMENY_LIMIT", "22"))
+PYTHON_LIMIT: int = 18  # without numpy - each extra candidate doubles the time
+WORK: int = 20_000_000  # branch and bound pairs looked at per component
+ILP_SIZES: tuple[int, int] = (30, 80)  # components the integer program takes first
+
+MODES: tuple[str, ...] = ("exact", "anytime", "anneal")
+mode: str = os.environ.get("MRCV_KEMENY", "anytime")
+seconds: float = float(os.environ.get("MRCV_KEMENY_SECONDS", "5"))
+
+
+class Ranking(NamedTuple):
+    order: list[int]  # matrix indices, best first
+    score: int
+    unique: bool  # proven that no other ranking reaches 'score'
+    winners: list[int]  # everyone some optimal ranking puts first
+    bound: int | None = None  # a ceiling on the optimum - 'None' when 'score' is it
+
+    # a search ranking's winner is only a best guess - even with the gap closed, another
+    # optimal ranking might put someone else first - so it's never unique
+    def result(self, candidates: Sequence[Hashable]) -> Result:
+        if not self.winners:
+            return None, False
+        return candidates[self.winners[0]], len(self.winners) == 1 and self.bound is None
+
+    # how far 'score' could be from the optimum
+    def gap(self) -> int:
+        return 0 if self.bound is None else self.bound - self.score
+
+
+# time and work per solver since the last 'reset_stats' (printed by 'main')
+counters: dict[str, float] = {}
+
+
+def count(key: str, amount: float) -> None:
+    counters[key] = counters.get(key, 0) + amount
+
+
+def stats() -> dict[str, float]:
+    return dict(counters)
+
+
+def reset_stats() -> None:
+    counters.clear()
+
+
+def set_mode(name: str, budget: float | None = None) -> None:
+    global mode, seconds
+    if name not in MODES:
+        raise ValueError(f"unknown kemeny mode '{name}', expected one of {', '.join(MODES)}")
+    mode = name
+    if budget is not None:
+        seconds = budget
+
+
+# best score of every subset and how many rankings reach it (up to 2) - the same table as
+# 'vectorized.kemeny_table', with the 'votes[d][c]' sums kept per subset
+def python_table(votes: list[list[int]]) -> tuple[list[int], list[int]]:
+    size: int = len(votes)
+    best: list[int] = [0] * (1 << size)
+    ways: list[int] = [1] + [0] * ((1 << size) - 1)
+    behind: list[list[int]] = [[0] * size] + [[] for _ in range((1 << size) - 1)]
+
+    for subset in range(1, 1 << size):
+        if not subset & 4095:
+            budget.check(4096)
+        low: int = subset & -subset
+        row: list[int] = votes[low.bit_length() - 1]
+        behind[subset] = [a + b for a, b in zip(behind[subset ^ low], row)]
+
+        top: int = -1
+        count: int = 0
+        rest: int = subset
+        while rest:
+            bit: int = rest & -rest
+            rest ^= bit
+            c: int = bit.bit_length() - 1
+            score: int = best[subset ^ bit] + behind[subset][c] - votes[c][c]
+            if score > top:
+                top, count = score, ways[subset ^ bit]
+            elif score == top:
+                count = min(count + ways[subset ^ bit], 2)
+        best[subset] = top
+        ways[subset] = count
+
+    return best, ways
+
+
+# the optimal ranking of every candidate in 'votes' - refused above 'limit' candidates
+def dynamic_programming(votes: list[list[int]], limit: int | None = None) -> Ranking:
+    size: int = len(votes)
+    numpy: bool = use_numpy()
+    most: int = limit if limit is not None else LIMIT if numpy else min(LIMIT, PYTHON_LIMIT)
+    if size > most:
+        raise ValueError(
+            f"kemeny-young is exact only up to {most} candidates here, not {size}"
+            f" (raise it with 'MRCV_KEMENY_LIMIT'{'' if numpy else ' or install numpy'})"
+        )
+    if size == 0:
+        return Ranking([], 0, True, [])
+
+    if vectorized is not None and numpy:
+        best, ways = vectorized.kemeny_table(votes)
+    else:
+        best, ways = python_table(votes)
+    count("dynamic program subsets", 1 << size)
+
+    # walk back from everyone, taking off a candidate that can come last each time
+    full: int = (1 << size) - 1
+    order: list[int] = []
+    subset: int = full
+    while subset:
+        for c in range(size):
+            bit: int = 1 << c
+            if subset & bit and best[subset] == best[subset ^ bit] + sum(
+                votes[d][c] for d in range(size) if subset & (1 << d) and d != c
+            ):
+                order.append(c)
+                subset ^= bit
+                break
+    order.reverse()
+
+    # and everyone who can come first
+    winners: list[int] = [
+        c
+        for c in range(size)
+        if best[full]
+        == best[full ^ (1 << c)] + sum(votes[c][d] for d in range(size) if d != c)
+    ]
+    return Ranking(order, best[full], ways[full] == 1, winners)
+
+
+# votes a ranking agrees with
+def score(votes: list[list[int]], order: list[int]) -> int:
+    return sum(votes[c][d] for i, c in enumerate(order) for d in order[i + 1 :])
+
+
+# candidates best margin first, recounted over whoever's left after each pick
+def greedy(votes: list[list[int]]) -> list[int]:
+    remaining: list[int] = list(range(len(votes)))
+    order: list[int] = []
+    while remaining:
+        pick: int = max(
+            remaining, key=lambda c: sum(votes[c][r] - votes[r][c] for r in remaining)
+        )
+        remaining.remove(pick)
+        order.append(pick)
+    return order
+
+
+# the optimal ranking of every candidate in 'votes', searched one place at a time from the
+# top - raises a ValueError once 'work' pairs have been looked at
+def branch_and_bound(votes: list[list[int]], work: int = WORK) -> Ranking:
+    size: int = len(votes)
+    if size == 0:
+        return Ranking([], 0, True, [])
+    larger: list[list[int]] = [
+        [max(votes[i][j], votes[j][i]) for j in range(size)] for i in range(size)
+    ]
+
+    order: list[int] = greedy(votes)
+    best: int = score(votes, order)
+    found: int = 0  # optimal rankings reached, counted up to 2
+    firsts: set[int] = set()  # and the candidates they start with
+    seen: dict[int, int] = {}  # best score of each set of candidates placed so far
+    prefix: list[int] = []
+    done: int = 0
+
+    def search(placed: int, so_far: int, ceiling: int) -> None:
+        nonlocal best, found, order, done
+        remaining: list[int] = [c for c in range(size) if not placed & (1 << c)]
+        done += len(remaining) ** 2
+        budget.check(len(remaining) ** 2)
+        if done > work:
+            raise ValueError(f"no kemeny-young proof for {size} candidates in {work} steps")
+        if not remaining:
+            if so_far > best or not found:
+                best, found, order = so_far, 1, prefix[:]
+                firsts.clear()
+            else:
+                found = 2
+            firsts.add(prefix[0])
+            return
+
+        # (votes gained by placing c next, what the ceiling loses with it, c)
+        steps: list[tuple[int, int, int]] = sorted(
+            (
+                (
+                    sum(votes[c][r] for r in remaining if r != c),
+                    sum(larger[c][r] for r in remaining if r != c),
+                    c,
+                )
+                for c in remaining
+            ),
+            key=lambda step: -step[0],
+        )
+        for gained, lost, c in steps:
+            placing: int = placed | (1 << c)
+            total: int = so_far + gained
+            bound: int = total + ceiling - lost
+            # a known optimum's first candidate can't add anything but another tie
+            repeat: bool = found == 2 and (prefix[0] if prefix else c) in firsts
+            if bound < best or (bound == best and repeat):
+                continue
+            before: int | None = seen.get(placing)
+            if before is not None and (total < before or (total == before and repeat)):
+                continue
+            seen[placing] = total if before is None else max(before, total)
+
+            prefix.append(c)
+            search(placing, total, ceiling - lost)
+            prefix.pop()
+
+    try:
+        search(0, 0, sum(larger[i][j] for i in range(size) for j in range(i + 1, size)))
+    finally:
+        count("branch and bound pairs", done)
+    # 'search' sets 'found', which pyright can't see from here
+    unique: bool = found == 1  # pyright: ignore[reportUnnecessaryComparison]
+    return Ranking(order, best, unique, sorted(firsts))
+
+
+# a ceiling on the best score - the larger side of every pair, less the smallest margin of
+# each majority cycle of three (any ranking goes against the majority on one of its pairs),
+# over cycles that share no pair
+def upper_bound(votes: list[list[int]]) -> int:
+    size: int = len(votes)
+    ceiling: int = sum(
+        max(votes[i][j], votes[j][i]) for i in range(size) for j in range(i + 1, size)
+    )
+
+    # (weakest margin, a, b, c) for a over b over c over a, starting from the lowest index
+    graph: list[list[int]] = beats(votes)
+    cycles: list[tuple[int, int, int, int]] = [
+        (
+            min(
+                votes[a][b] - votes[b][a],
+                votes[b][c] - votes[c][b],
+                votes[c][a] - votes[a][c],
+            ),
+            a,
+            b,
+            c,
+        )
+        for a in range(size)
+        for b in graph[a]
+        if b > a
+        for c in graph[b]
+        if c > a and votes[c][a] > votes[a][c]
+    ]
+
+    used: set[tuple[int, int]] = set()
+    for weakest, a, b, c in sorted(cycles, reverse=True):
+        pairs: list[tuple[int, int]] = [
+            (min(x, y), max(x, y)) for x, y in ((a, b), (b, c), (c, a))
+        ]
+        if not used.intersection(pairs):
+            used.update(pairs)
+            ceiling -= weakest
+    return ceiling
+
+
+# insertion local search - each candidate in turn moves to wherever gains the most, until
+# nobody gains. a move of one place is an adjacent swap worth 'votes[b][a] - votes[a][b]',
+# so every place a candidate could go is scored in one sweep out from where it is
+def improve(votes: list[list[int]], order: list[int], deadline: float) -> list[int]:
+    order = order[:]
+    size: int = len(order)
+    improved: bool = True
+    while improved and time.perf_counter() < deadline:
+        improved = False
+        for i in range(size):
+            a: int = order[i]
+            best: int = 0
+            to: int = i
+            gained: int = 0
+            for j in range(i - 1, -1, -1):
+                gained += votes[a][order[j]] - votes[order[j]][a]
+                if gained > best:
+                    best, to = gained, j
+            gained = 0
+            for j in range(i + 1, size):
+                gained += votes[order[j]][a] - votes[a][order[j]]
+                if gained > best:
+                    best, to = gained, j
+            if to != i:
+                order.insert(to, order.pop(i))
+                improved = True
+    return order
+
+
+# simulated annealing over adjacent swaps until 'deadline' - worse swaps are taken with a
+# chance that shrinks as the temperature falls to nothing. the best ranking seen is returned
+def anneal(
+    votes: list[list[int]], order: list[int], deadline: float, rng: random.Random
+) -> list[int]:
+    current: list[int] = order[:]
+    best: list[int] = order[:]
+    if len(order) < 2:
+        return best
+    value: int = 0
+    top: int = 0  # scores relative to 'order'
+    margins: list[int] = [abs(votes[a][b] - votes[b][a]) for a, b in zip(order, order[1:])]
+    hottest: float = max(1.0, sum(margins) / len(margins))
+
+    start: float = time.perf_counter()
+    temperature: float = hottest
+    moves: int = 0
+    while True:
+        moves += 1
+        if moves % 1000 == 0:
+            now: float = time.perf_counter()
+            if now >= deadline:
+                break
+            temperature = hottest * (1 - (now - start) / (deadline - start))
+
+        i: int = rng.randrange(len(current) - 1)
+        a, b = current[i], current[i + 1]
+        delta: int = votes[b][a] - votes[a][b]
+        if delta >= 0 or rng.random() < math.exp(delta / max(temperature, 1e-9)):
+            current[i], current[i + 1] = b, a
+            value += delta
+            if value > top:
+                top, best = value, current[:]
+    return best
+
+
+# everyone the ranking's winner ties with - candidates who score the same moved to first
+def level_with_first(votes: list[list[int]], order: list[int]) -> list[int]:
+    tied: list[int] = order[:1]
+    for i in range(1, len(order)):
+        c: int = order[i]
+        if sum(votes[c][d] - votes[d][c] for d in order[:i]) == 0:
+            tied.append(c)
+    return tied
+
+
+# the best ranking local search finds in 'budget' seconds, from the borda and copeland
+# orders of the matrix, with the ceiling it's measured against. anything left after the
+# first local optimum goes to annealing, or to restarts from shuffled stretches of the best
+def anytime(votes: list[list[int]], budget: float, annealing: bool = False) -> Ranking:
+    size: int = len(votes)
+    deadline: float = time.perf_counter() + budget
+    rng: random.Random = random.Random(size)  # the same run for the same election
+
+    borda: list[int] = [sum(row) for row in votes]
+    copeland: list[float] = copeland_scores(votes)
+    starts: list[list[int]] = [
+        sorted(range(size), key=lambda c: -borda[c]),
+        sorted(range(size), key=lambda c: (-copeland[c], -borda[c])),
+    ]
+    order: list[int] = max(
+        (improve(votes, start, deadline) for start in starts),
+        key=lambda found: score(votes, found),
+    )
+    best: int = score(votes, order)
+
+    while time.perf_counter() < deadline and size > 2:
+        if annealing:
+            annealed: list[int] = anneal(votes, order, deadline, rng)
+            candidate: list[int] = improve(votes, annealed, math.inf)
+        else:
+            i: int = rng.randrange(size - 1)
+            j: int = rng.randrange(i + 2, min(size, i + 10) + 1)
+            candidate = order[:]
+            stretch: list[int] = candidate[i:j]
+            rng.shuffle(stretch)
+            candidate[i:j] = stretch
+            candidate = improve(votes, candidate, deadline)
+        value: int = score(votes, candidate)
+        if value >= best:
+            order, best = candidate, value
+
+    ceiling: int = upper_bound(votes)
+    return Ranking(order, best, False, level_with_first(votes, order), max(ceiling, best))
+
+
+# one component - picked by size: the integer program for 'ILP_SIZES' when scipy is
+# installed, otherwise (or once it runs out of time) branch and bound, then the dynamic
+# program, and in the 'anytime' and 'anneal' modes local search for what's left
+def component(votes: list[list[int]], limit: int | None = None) -> Ranking:
+    size: int = len(votes)
+    if size <= 1:
+        return Ranking(list(range(size)), 0, True, list(range(size)))
+    count("components", 1)
+
+    start: float = time.perf_counter()
+    if linear_ordering is not None and ILP_SIZES[0] <= size <= ILP_SIZES[1]:
+        try:
+            solution = linear_ordering.solve(votes, budget.remaining(seconds))
+            count("integer program nodes", solution.nodes)
+            count("integer program cuts", solution.cuts)
+            return Ranking(solution.order, solution.score, solution.unique, solution.winners)
+        except ValueError:  # out of time
+            pass
+        finally:
+            count("integer program seconds", time.perf_counter() - start)
+
+    start = time.perf_counter()
+    try:
+        return branch_and_bound(votes)
+    except (ValueError, BudgetExceeded):
+        pass
+    finally:
+        count("branch and bound seconds", time.perf_counter() - start)
+
+    start = time.perf_counter()
+    try:
+        return dynamic_programming(votes, limit)
+    except (ValueError, BudgetExceeded):
+        if mode == "exact":
+            raise
+    finally:
+        count("dynamic program seconds", time.perf_counter() - start)
+
+    start = time.perf_counter()
+    try:
+        return anytime(votes, budget.remaining(seconds), mode == "anneal")
+    finally:
+        count("local search seconds", time.perf_counter() - start)
+
+
+# the strongly connected components of 'beats_or_ties', first place first
+def decompose(votes: list[list[int]]) -> list[list[int]]:
+    return components(beats_or_ties(votes))[::-1]
+
+
+# 'votes' restricted to 'members', in that order
+def restrict(votes: list[list[int]], members: list[int]) -> list[list[int]]:
+    return [[votes[i][j] for j in members] for i in members]
+
+
+# the optimal ranking of every candidate, one component at a time
+def solve(votes: list[list[int]], limit: int | None = None) -> Ranking:
+    order: list[int] = []
+    unique: bool = True
+    winners: list[int] = []
+    gap: int | None = None  # 'None' while every component is proven
+    found: list[list[int]] = decompose(votes)
+    for k, members in enumerate(found):
+        budget.note(f"kemeny-young component {k + 1} of {len(found)}")
+        ranking: Ranking = component(restrict(votes, members), limit)
+        order.extend(members[c] for c in ranking.order)
+        unique = unique and ranking.unique
+        if ranking.bound is not None:
+            gap = (gap or 0) + ranking.gap()
+        if k == 0:
+            winners = [members[c] for c in ranking.winners]
+    total: int = score(votes, order)
+    return Ranking(order, total, unique, winners, None if gap is None else total + gap)
+
+
+# just the first component's optimal ranking - all that decides the winner
+def top(votes: list[list[int]], limit: int | None = None) -> Ranking:
+    found: list[list[int]] = decompose(votes)
+    if not found:
+        return Ranking([], 0, True, [])
+    members: list[int] = found[0]
+    restricted: list[list[int]] = restrict(votes, members)
+    ranking: Ranking = component(restricted, limit)
+    return Ranking(
+        [members[c] for c in ranking.order],
+        ranking.score,
+        ranking.unique,
+        [members[c] for c in ranking.winners],
+        ranking.bound,
+    )
+
+
+def main():
+    from .utility import load_election  # here, since 'utility' is only needed to print
+
+    parser = argparse.ArgumentParser(description="kemeny-young rankings")
+    parser.add_argument("files", nargs="+", help="election files (JSON or binary)")
+    parser.add_argument(
+        "--mode", choices=MODES, default=mode, help="what to do past the exact solvers"
+    )
+    parser.add_argument(
+        "--seconds", type=float, default=seconds, help="local search budget per component"
+    )
+    args = parser.parse_args()
+    set_mode(args.mode, args.seconds)
+
+    for fname in args.files:
+        ballots: Sequence[Ballot] = load_election(fname, profile=True).ballots
+        candidates: list[Hashable] = sorted({c for b in ballots for c in b.ranking}, key=str)
+        votes: list[list[int]] = pairwise_matrix(ballots, candidates)
+        reset_stats()
+        sizes: list[int] = [len(members) for members in decompose(votes)]
+        start: float = time.perf_counter()
+        try:
+            ranking: Ranking = solve(votes)
+        except ValueError as error:
+            print(f"{fname}: {error}")
+            continue
+        print(f"{fname}: components {sizes}")
+        took: float = time.perf_counter() - start
+        if ranking.bound is None:
+            print(f"  score {ranking.score} (optimal) in {took:.2f}s")
+        else:
+            print(f"  score {ranking.score} of at most {ranking.bound} in {took:.2f}s")
+        names: list[Hashable] = [candidates[c] for c in ranking.order]
+        print(f"  {'unique' if ranking.unique else 'tied'}: {names}")
+        print(f"  {', '.join(f'{key} {value:g}' for key, value in stats().items())}")
+
+
+if __name__ == "__main__":
+    main()
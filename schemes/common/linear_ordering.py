@@ -0,0 +1,180 @@
+# Kemeny-Young as an integer program - the linear ordering problem, solved with scipy's
+# 'milp' (HiGHS). scipy is optional - 'kemeny.py' only uses this module when it imports
+# pyright: strict
+#
+# one 0/1 variable per pair i < j, 1 when i is ranked above j, so a ranking scores
+#
+#   sum of votes[j][i] + (votes[i][j] - votes[j][i]) * x[i][j]
+#
+# any 0/1 choice is a ranking as long as no three candidates go round in a cycle:
+#
+#   0 <= x[i][j] + x[j][k] - x[i][k] <= 1     for i < j < k
+#
+# there are C^3 / 6 of those, and the optimum breaks few of them, so they're added lazily -
+# solve without them, add the ones the answer breaks and solve again until it breaks none.
+# every other winner is found by forbidding the ones found so far from coming first, and
+# uniqueness by forbidding the optimal ranking itself
+
+import time
+from typing import Any, NamedTuple, cast
+
+import numpy as np
+from scipy.optimize import Bounds, LinearConstraint, milp  # type: ignore
+from scipy.sparse import csr_matrix  # type: ignore
+
+# scipy's calls go through 'cast(Any, ...)' - without scipy installed pyright knows nothing
+# of them, and strict mode would reject every value they return
+
+
+class Solution(NamedTuple):
+    order: list[int]
+    score: int
+    unique: bool
+    winners: list[int]
+    nodes: int  # branch and bound nodes, over every solve
+    cuts: int  # transitivity rows added
+
+
+# a row of the constraint matrix - (coefficients, lower bound)
+Row = tuple[Any, float]
+
+
+class LinearOrdering:
+    def __init__(self, votes: list[list[int]], deadline: float) -> None:
+        self.votes: list[list[int]] = votes
+        self.size: int = len(votes)
+        self.deadline: float = deadline
+        self.pairs: list[tuple[int, int]] = [
+            (i, j) for i in range(self.size) for j in range(i + 1, self.size)
+        ]
+        self.index: dict[tuple[int, int], int] = {
+            pair: k for k, pair in enumerate(self.pairs)
+        }
+        self.base: int = sum(votes[j][i] for i, j in self.pairs)
+        self.gains: Any = np.array(
+            [votes[i][j] - votes[j][i] for i, j in self.pairs], dtype=np.float64
+        )
+        self.cuts: list[tuple[int, int, int]] = []
+        self.nodes: int = 0
+
+    # the pair variable for 'a' above 'b' - (index, sign, constant)
+    def above(self, a: int, b: int) -> tuple[int, int, int]:
+        if a < b:
+            return self.index[(a, b)], 1, 0
+        return self.index[(b, a)], -1, 1
+
+    # the best ranking under 'rows' (each 'coefficients @ x >= lower') and the transitivity
+    # rows found so far, adding more until it's a ranking - 'None' if nothing fits 'rows'
+    def optimize(self, rows: list[Row]) -> tuple[list[int], int] | None:
+        while True:
+            remaining: float = self.deadline - time.perf_counter()
+            if remaining <= 0:
+                raise self.out_of_time()
+
+            # sparse - three entries per transitivity row
+            index: dict[tuple[int, int], int] = self.index
+            entries: list[tuple[int, int, float]] = []
+            for r, (i, j, k) in enumerate(self.cuts):
+                entries += [(r, index[(i, j)], 1), (r, index[(j, k)], 1)]
+                entries.append((r, index[(i, k)], -1))
+            for r, (coefficients, _) in enumerate(rows, len(self.cuts)):
+                nonzero: Any = np.flatnonzero(coefficients)
+                entries += [(r, int(k), coefficients[k]) for k in nonzero]
+            height: int = len(self.cuts) + len(rows)
+            lower: Any = np.array([0.0] * len(self.cuts) + [bound for _, bound in rows])
+            upper: Any = np.array([1.0] * len(self.cuts) + [np.inf] * len(rows))
+
+            constraints: list[Any] = []
+            if height:
+                r, c, v = zip(*entries)
+                matrix: Any = cast(Any, csr_matrix)(
+                    (v, (r, c)), shape=(height, len(self.pairs))
+                )
+                constraints.append(cast(Any, LinearConstraint)(matrix, lower, upper))
+
+            found: Any = cast(Any, milp)(
+                -self.gains,
+                constraints=constraints,
+                integrality=np.ones(len(self.pairs)),
+                bounds=cast(Any, Bounds)(0, 1),
+                options={"time_limit": remaining},
+            )
+            self.nodes += int(getattr(found, "mip_node_count", 0) or 0)
+            if found.status == 2:  # infeasible
+                return None
+            if found.status != 0:
+                raise self.out_of_time()
+
+            x: Any = np.rint(np.asarray(found.x, dtype=np.float64)).astype(np.int64)
+            broken: list[tuple[int, int, int]] = self.cycles(x)
+            if not broken:
+                return self.ranking(x), self.base + int(round(-found.fun))
+            self.cuts.extend(broken)
+
+    def out_of_time(self) -> ValueError:
+        return ValueError(f"no kemeny-young proof for {self.size} candidates in time")
+
+    # every i < j < k the answer goes round in a cycle
+    def cycles(self, x: Any) -> list[tuple[int, int, int]]:
+        index: dict[tuple[int, int], int] = self.index
+        return [
+            (i, j, k)
+            for i, j in self.pairs
+            for k in range(j + 1, self.size)
+            if not 0 <= x[index[(i, j)]] + x[index[(j, k)]] - x[index[(i, k)]] <= 1
+        ]
+
+    # a transitive answer as a ranking - by how many candidates each is ranked above
+    def ranking(self, x: Any) -> list[int]:
+        wins: list[int] = [0] * self.size
+        for (i, j), above in zip(self.pairs, x):
+            wins[i if above else j] += 1
+        return sorted(range(self.size), key=lambda c: -wins[c])
+
+    # someone is ranked above 'c'
+    def not_first(self, c: int) -> Row:
+        coefficients: Any = np.zeros(len(self.pairs))
+        constant: int = 0
+        for d in range(self.size):
+            if d != c:
+                k, sign, offset = self.above(d, c)
+                coefficients[k] += sign
+                constant += offset
+        return coefficients, 1 - constant
+
+    # at least one pair is ranked differently from 'order'
+    def not_order(self, order: list[int]) -> Row:
+        coefficients: Any = np.zeros(len(self.pairs))
+        constant: int = 0
+        for n, a in enumerate(order):
+            for b in order[n + 1 :]:
+                k, sign, offset = self.above(b, a)
+                coefficients[k] += sign
+                constant += offset
+        return coefficients, 1 - constant
+
+
+# the optimal ranking of every candidate in 'votes' - raises a ValueError past 'budget'
+def solve(votes: list[list[int]], budget: float) -> Solution:
+    if len(votes) < 2:
+        return Solution(list(range(len(votes))), 0, True, list(range(len(votes))), 0, 0)
+    problem: LinearOrdering = LinearOrdering(votes, time.perf_counter() + budget)
+    optimum: tuple[list[int], int] | None = problem.optimize([])
+    assert optimum is not None  # every ranking is feasible
+    order, best = optimum
+
+    winners: list[int] = [order[0]]
+    excluded: list[Row] = []
+    while len(winners) < len(votes):
+        excluded.append(problem.not_first(winners[-1]))
+        other: tuple[list[int], int] | None = problem.optimize(excluded)
+        if other is None or other[1] < best:
+            break
+        winners.append(other[0][0])
+
+    unique: bool = False
+    if len(winners) == 1:
+        other = problem.optimize([problem.not_order(order)])
+        unique = other is None or other[1] < best
+
+    return Solution(order, best, unique, sorted(winners), problem.nodes, len(problem.cuts))
@@ -0,0 +1,67 @@
+# Per-election memo - statistics shared by every scheme run on the same ballots in one process
+# pyright: strict
+#
+# entries are keyed by the election's fingerprint (see 'BallotProfile.fingerprint'), so the
+# first scheme to need the pairwise matrix, majority graph, Smith set or Borda scores pays
+# for them and the rest reuse them (see 'pairwise.py'). only ballots that still match their
+# profile are memoized - eliminating a candidate or merging ballots detaches them.
+#
+# the 'capacity' most recently used elections are kept, 'invalidate' drops one (or all), and
+# 'hits' / 'misses' count lookups - 'stats' reports them after a batch (see 'warehouse.py')
+
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Sequence, TypeVar
+
+from .types import Ballot
+from .profile import BallotProfile, CandidateBallots
+
+T = TypeVar("T")
+
+
+class ElectionMemo:
+    def __init__(self, capacity: int = 8) -> None:
+        self.capacity: int = capacity
+        self.entries: OrderedDict[str, dict[Hashable, Any]] = OrderedDict()
+        self.hits: int = 0
+        self.misses: int = 0
+
+    # the value stored under 'key' for this election, computing it on a miss
+    def get(self, profile: BallotProfile, key: Hashable, compute: Callable[[], T]) -> T:
+        fingerprint: str = profile.fingerprint()
+        entry: dict[Hashable, Any] | None = self.entries.get(fingerprint)
+        if entry is None:
+            entry = {}
+            self.entries[fingerprint] = entry
+            while len(self.entries) > self.capacity:
+                self.entries.popitem(last=False)  # least recently used
+        else:
+            self.entries.move_to_end(fingerprint)
+
+        if key in entry:
+            self.hits += 1
+            return entry[key]
+
+        self.misses += 1
+        value: T = compute()
+        entry[key] = value
+        return value
+
+    # forget one election - every election without a profile
+    def invalidate(self, profile: BallotProfile | None = None) -> None:
+        if profile is None:
+            self.entries.clear()
+        else:
+            self.entries.pop(profile.fingerprint(), None)
+
+    def stats(self) -> dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "elections": len(self.entries)}
+
+
+memo: ElectionMemo = ElectionMemo()
+
+
+# the profile 'ballots' still match, if any - only those can share entries
+def profile_of(ballots: Sequence[Ballot]) -> BallotProfile | None:
+    if isinstance(ballots, CandidateBallots):
+        return ballots.profile
+    return None
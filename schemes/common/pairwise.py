@@ -0,0 +1,327 @@
+# Pairwise (head-to-head) matrix - one pass over the ballots, shared by every Condorcet scheme
+# pyright: strict
+#
+# 'matrix[i][j]' is the number of votes ranking candidates[i] over candidates[j]. a ranked
+# candidate beats every unranked one, and two unranked candidates are left alone - the
+# same counting the schemes' own per-pair loops did.
+#
+# two builders, picked from the profile's ballot lengths (see 'pairwise_matrix'):
+#   dense   each ballot's ranked pairs are counted once (O(L^2)), and each ranked
+#           candidate's wins over the unranked are credited a whole row at a time (O(L * C))
+#   sparse  only the ranked pairs are counted, along with how many votes mention each
+#           candidate - a candidate beats everyone its voters didn't rank above it, so
+#           its row is its mentions less those losses (O(L^2) per ballot, O(C^2) once)
+# and, with numpy installed, vectorized versions of both (see 'vectorized.py').
+# 'rank_counts' is the positional counterpart - votes per candidate per rank, and
+# 'strongest_paths' the schulze beatpaths read off the pairwise defeats.
+#
+# both are memoized per election (see 'memo.py'), along with what's derived from them -
+# the majority graph, the Smith set and Borda scores - so schemes run on the same ballots
+# in one process build them once. memoized values are shared, so treat them as read-only
+#
+# eliminating a candidate doesn't change any head-to-head count between the others, so a
+# 'PairwiseMatrix' built once is masked as candidates go (O(C)) and answers Smith set and
+# Condorcet questions for whoever's left without going back to the ballots.
+#
+# the backend is 'auto' (numpy when it's installed), 'numpy' or 'python' - set with
+# 'set_backend', '--backend' on the scheme scripts or 'MRCV_BACKEND'
+#
+# usage (from 'schemes'): python -m common.pairwise [election files...]
+# times every builder on each file - with no files, every '../academy-ballots/*/*.json'
+
+import os
+import glob
+import time
+import argparse
+from typing import Callable, Hashable, Sequence, TypeVar
+
+from .types import Ballot
+from .profile import BallotProfile, ranked_ids
+from .memo import memo, profile_of
+from . import tournament
+
+try:
+    from . import vectorized
+except ImportError:  # numpy is optional
+    vectorized = None
+
+BACKENDS: tuple[str, ...] = ("auto", "numpy", "python")
+backend: str = os.environ.get("MRCV_BACKEND", "auto")
+
+T = TypeVar("T")
+
+
+def set_backend(name: str) -> None:
+    global backend
+    if name not in BACKENDS:
+        raise ValueError(f"unknown backend '{name}', expected one of {', '.join(BACKENDS)}")
+    if name == "numpy" and vectorized is None:
+        raise ValueError("the numpy backend needs numpy installed")
+    backend = name
+
+
+def use_numpy() -> bool:
+    return vectorized is not None and backend in ("auto", "numpy")
+
+
+def pairwise_matrix(
+    ballots: Sequence[Ballot], candidates: Sequence[Hashable]
+) -> list[list[int]]:
+    profile: BallotProfile | None = profile_of(ballots)
+    asked: list[int] | None = None if profile is None else profile_ids(profile, candidates)
+    if profile is None or asked is None:
+        return build_pairwise_matrix(ballots, candidates)
+
+    # every candidate once, in id order - then the rows and columns asked for
+    ids: list[int] = list(range(len(profile.candidates)))
+    matrix: list[list[int]] = memo.get(
+        profile, "pairwise", lambda: build_pairwise_matrix(ballots, ids)
+    )
+    if asked == ids:
+        return [row[:] for row in matrix]
+    return [[matrix[c][d] for d in asked] for c in asked]
+
+
+def build_pairwise_matrix(
+    ballots: Sequence[Ballot], candidates: Sequence[Hashable]
+) -> list[list[int]]:
+    if vectorized is not None and use_numpy():
+        return vectorized.pairwise_matrix(ballots, candidates)
+    return python_pairwise_matrix(ballots, candidates)
+
+
+# dense if ballots rank most of the candidates, sparse if they're short
+def python_pairwise_matrix(
+    ballots: Sequence[Ballot], candidates: Sequence[Hashable]
+) -> list[list[int]]:
+    size: int = len(candidates)
+    ranked: int = sum(len(ballot.ranking) for ballot in ballots)
+    average: float = ranked / len(ballots) if ballots else 0
+
+    dense_cost: float = ranked * size
+    sparse_cost: float = ranked * average / 2 + size * size
+    if sparse_cost < dense_cost:
+        return sparse_pairwise_matrix(ballots, candidates)
+    return dense_pairwise_matrix(ballots, candidates)
+
+
+def dense_pairwise_matrix(
+    ballots: Sequence[Ballot], candidates: Sequence[Hashable]
+) -> list[list[int]]:
+    index: dict[Hashable, int] = {c: i for i, c in enumerate(candidates)}
+    size: int = len(candidates)
+    matrix: list[list[int]] = [[0] * size for _ in range(size)]
+
+    for ballot in ballots:
+        tally: int = ballot.tally
+        if tally == 0:
+            continue
+
+        ranked: list[int] = ranked_ids(ballot, index)
+        for i, c in enumerate(ranked):
+            # credit the whole row, then take back itself and everyone ranked above it
+            row: list[int] = [votes + tally for votes in matrix[c]]
+            for d in ranked[: i + 1]:
+                row[d] -= tally
+            matrix[c] = row
+
+    return matrix
+
+
+def sparse_pairwise_matrix(
+    ballots: Sequence[Ballot], candidates: Sequence[Hashable]
+) -> list[list[int]]:
+    index: dict[Hashable, int] = {c: i for i, c in enumerate(candidates)}
+    size: int = len(candidates)
+    mentions: list[int] = [0] * size
+    # 'behind[c][d]' - votes ranking d above c (only pairs that were ever ranked)
+    behind: list[dict[int, int]] = [{} for _ in range(size)]
+
+    for ballot in ballots:
+        tally: int = ballot.tally
+        if tally == 0:
+            continue
+
+        ranked: list[int] = ranked_ids(ballot, index)
+        for i, c in enumerate(ranked):
+            mentions[c] += tally
+            losses: dict[int, int] = behind[c]
+            for d in ranked[:i]:
+                losses[d] = losses.get(d, 0) + tally
+
+    matrix: list[list[int]] = []
+    for c in range(size):
+        row: list[int] = [mentions[c]] * size
+        for d, votes in behind[c].items():
+            row[d] -= votes
+        row[c] = 0
+        matrix.append(row)
+
+    return matrix
+
+
+# 'counts[c][k]' - votes ranking candidates[c] in position k, rankings taken as cast
+def rank_counts(
+    ballots: Sequence[Ballot], candidates: Sequence[Hashable]
+) -> list[list[int]]:
+    return [row[:] for row in memoized(ballots, candidates, "ranks", build_rank_counts)]
+
+
+def build_rank_counts(
+    ballots: Sequence[Ballot], candidates: Sequence[Hashable]
+) -> list[list[int]]:
+    if vectorized is not None and use_numpy():
+        return vectorized.rank_counts(ballots, candidates)
+
+    index: dict[Hashable, int] = {c: i for i, c in enumerate(candidates)}
+    longest: int = max((len(b.ranking) for b in ballots), default=0)
+    counts: list[list[int]] = [[0] * longest for _ in candidates]
+    for ballot in ballots:
+        for k, candidate in enumerate(ballot.ranking):
+            counts[index[candidate]][k] += ballot.tally
+
+    return counts
+
+
+# strongest paths over 'defeats' (see 'tournament.strongest_paths')
+def strongest_paths(defeats: list[list[int]]) -> list[list[int]]:
+    if vectorized is not None and use_numpy():
+        return vectorized.strongest_paths(defeats)
+    return tournament.strongest_paths(defeats)
+
+
+# 'matrix[i][j]' is 1 if a majority ranks candidates[i] over candidates[j], 0 otherwise
+def majority_graph(
+    ballots: Sequence[Ballot], candidates: Sequence[Hashable]
+) -> list[list[int]]:
+    def build(ballots: Sequence[Ballot], candidates: Sequence[Hashable]) -> list[list[int]]:
+        votes: list[list[int]] = pairwise_matrix(ballots, candidates)
+        return [
+            [1 if votes[i][j] > votes[j][i] else 0 for j in range(len(candidates))]
+            for i in range(len(candidates))
+        ]
+
+    return [row[:] for row in memoized(ballots, candidates, "majority", build)]
+
+
+# smallest set of candidates who each beat everyone outside it (see 'tournament.py'),
+# in 'candidates' order
+def smith_set(ballots: Sequence[Ballot], candidates: Sequence[Hashable]) -> list[Hashable]:
+    def build(ballots: Sequence[Ballot], candidates: Sequence[Hashable]) -> list[Hashable]:
+        votes: list[list[int]] = pairwise_matrix(ballots, candidates)
+        return [candidates[i] for i in tournament.smith_set(votes)]
+
+    return list(memoized(ballots, candidates, "smith", build))
+
+
+# borda count - 'size - 1' points for first down to 0 for last, 'size' candidates
+def borda_scores(ballots: Sequence[Ballot], candidates: Sequence[Hashable]) -> list[int]:
+    def build(ballots: Sequence[Ballot], candidates: Sequence[Hashable]) -> list[int]:
+        points: range = range(len(candidates) - 1, -1, -1)
+        return [
+            sum(p * votes for p, votes in zip(points, row))
+            for row in rank_counts(ballots, candidates)
+        ]
+
+    return list(memoized(ballots, candidates, "borda", build))
+
+
+# a pairwise matrix that candidates can be eliminated from (see the top of the file)
+class PairwiseMatrix:
+    def __init__(self, candidates: Sequence[Hashable], votes: list[list[int]]) -> None:
+        self.index: dict[Hashable, int] = {c: i for i, c in enumerate(candidates)}
+        self.names: list[Hashable] = list(candidates)
+        self.votes: list[list[int]] = votes
+        self.active: list[bool] = [True] * len(self.names)
+        self.remaining: list[int] = list(range(len(self.names)))  # active indices, in order
+
+    @classmethod
+    def of(cls, ballots: Sequence[Ballot], candidates: Sequence[Hashable]) -> "PairwiseMatrix":
+        return cls(candidates, pairwise_matrix(ballots, candidates))
+
+    def __contains__(self, candidate: Hashable) -> bool:
+        return candidate in self.index and self.active[self.index[candidate]]
+
+    def candidates(self) -> list[Hashable]:
+        return [self.names[i] for i in self.remaining]
+
+    # mask a candidate's row and column - eliminating one that's gone is a no-op
+    def remove(self, candidate: Hashable) -> None:
+        i: int = self.index[candidate]
+        if self.active[i]:
+            self.active[i] = False
+            self.remaining.remove(i)
+
+    # votes ranking 'a' over 'b'
+    def __getitem__(self, pair: tuple[Hashable, Hashable]) -> int:
+        return self.votes[self.index[pair[0]]][self.index[pair[1]]]
+
+    # the matrix over the remaining candidates, in 'candidates()' order
+    def matrix(self) -> list[list[int]]:
+        return [[self.votes[i][j] for j in self.remaining] for i in self.remaining]
+
+    def smith_set(self) -> list[Hashable]:
+        return [self.names[self.remaining[i]] for i in tournament.smith_set(self.matrix())]
+
+    def schwartz_set(self) -> list[Hashable]:
+        return [self.names[self.remaining[i]] for i in tournament.schwartz_set(self.matrix())]
+
+    def condorcet_winner(self) -> Hashable | None:
+        winner: int | None = tournament.condorcet_winner(self.matrix())
+        return None if winner is None else self.names[self.remaining[winner]]
+
+
+# 'build(ballots, candidates)', memoized with the election when the ballots match a profile
+def memoized(
+    ballots: Sequence[Ballot],
+    candidates: Sequence[Hashable],
+    key: str,
+    build: Callable[[Sequence[Ballot], Sequence[Hashable]], T],
+) -> T:
+    profile: BallotProfile | None = profile_of(ballots)
+    if profile is None or profile_ids(profile, candidates) is None:
+        return build(ballots, candidates)
+    return memo.get(profile, (key, tuple(candidates)), lambda: build(ballots, candidates))
+
+
+# 'candidates' as ids of 'profile', if they're distinct ids of it - the memo is kept by id
+def profile_ids(profile: BallotProfile, candidates: Sequence[Hashable]) -> list[int] | None:
+    size: int = len(profile.candidates)
+    ids: list[int] = [c for c in candidates if isinstance(c, int) and 0 <= c < size]
+    if len(ids) != len(candidates) or len(set(ids)) != len(ids):
+        return None
+    return ids
+
+
+def main():
+    from .utility import load_election  # here, since 'utility' is only needed to benchmark
+
+    parser = argparse.ArgumentParser(description="time the pairwise matrix")
+    parser.add_argument("files", nargs="*", help="election files (JSON or binary)")
+    args = parser.parse_args()
+
+    files: list[str] = args.files or sorted(glob.glob("../academy-ballots/*/*.json"))
+    for fname in files:
+        # interned ids, as the schemes see them (see 'profile.interned')
+        profile: BallotProfile = BallotProfile.of(load_election(fname, profile=True).ballots)
+        ballots: Sequence[Ballot] = profile.ballots()
+        candidates: list[Hashable] = list(range(len(profile.candidates)))
+
+        builders: list[Callable[[Sequence[Ballot], Sequence[Hashable]], list[list[int]]]] = [
+            dense_pairwise_matrix,
+            sparse_pairwise_matrix,
+        ]
+        if vectorized is not None:
+            builders.append(vectorized.pairwise_matrix)
+        for builder in builders:
+            start: float = time.perf_counter()
+            builder(ballots, candidates)
+            elapsed: float = time.perf_counter() - start
+            print(
+                f"{fname}: {len(candidates)} candidates, {len(ballots)} ballots, "
+                f"{builder.__module__}.{builder.__name__} {elapsed:.4f}s"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+# Ballot profiles - candidates interned to dense integer ids at load time
+# pyright: strict
+
+from array import array
+import hashlib
+import functools
+from typing import Callable, Hashable, Iterable, Iterator, Mapping, Sequence, overload
+
+from .types import Ballot, Result, Scheme
+from .budget import BudgetExceeded
+
+
+# rankings are stored flat: ballot i ranks 'ids[offsets[i]:offsets[i + 1]]' with 'tallies[i]' votes.
+# 'candidates' maps an id back to its name, 'positions' maps a name to its id ('index' would
+# hide 'Sequence.index'). iterating a profile yields ordinary (named) ballots, so it can
+# stand in for 'list[Ballot]'
+class BallotProfile(Sequence[Ballot]):
+    def __init__(
+        self,
+        candidates: list[Hashable],
+        offsets: Sequence[int],
+        ids: Sequence[int],
+        tallies: Sequence[int],
+    ) -> None:
+        self.candidates: list[Hashable] = candidates
+        self.positions: dict[Hashable, int] = {c: i for i, c in enumerate(candidates)}
+        self.offsets: Sequence[int] = offsets
+        self.ids: Sequence[int] = ids
+        self.tallies: Sequence[int] = tallies
+        self._ballots: CandidateBallots | None = None
+        self._fingerprint: str | None = None
+
+    # intern every candidate the first time it is seen
+    @classmethod
+    def from_ballots(cls, ballots: Iterable[Ballot]) -> "BallotProfile":
+        candidates: list[Hashable] = []
+        index: dict[Hashable, int] = {}
+        offsets: array[int] = array("i", [0])
+        ids: array[int] = array("i")
+        tallies: array[int] = array("i")
+
+        for ballot in ballots:
+            for candidate in ballot.ranking:
+                cid: int | None = index.get(candidate)
+                if cid is None:
+                    cid = len(candidates)
+                    index[candidate] = cid
+                    candidates.append(candidate)
+                ids.append(cid)
+            offsets.append(len(ids))
+            tallies.append(ballot.tally)
+
+        return cls(candidates, offsets, ids, tallies)
+
+    # reuse an existing profile, intern anything else
+    @classmethod
+    def of(cls, ballots: Sequence[Ballot]) -> "BallotProfile":
+        if isinstance(ballots, BallotProfile):
+            return ballots
+        return cls.from_ballots(ballots)
+
+    def __len__(self) -> int:
+        return len(self.tallies)
+
+    @overload
+    def __getitem__(self, i: int) -> Ballot: ...
+
+    @overload
+    def __getitem__(self, i: slice) -> list[Ballot]: ...
+
+    def __getitem__(self, i: int | slice) -> Ballot | list[Ballot]:
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("ballot index out of range")
+        names: list[Hashable] = self.candidates
+        return Ballot(tuple(names[c] for c in self.ranking(i)), self.tallies[i])
+
+    def __iter__(self) -> Iterator[Ballot]:
+        for i in range(len(self)):
+            yield self[i]
+
+    # candidate ids ranked on ballot 'i'
+    def ranking(self, i: int) -> tuple[int, ...]:
+        return tuple(self.ids[self.offsets[i] : self.offsets[i + 1]])
+
+    # ballots ranked by candidate id instead of name - built once, with position lookups
+    # and the set of candidate ids that appear on them
+    def ballots(self) -> "CandidateBallots":
+        if self._ballots is None:
+            self._ballots = CandidateBallots(
+                (ranked_ballot(self.ranking(i), self.tallies[i]) for i in range(len(self))),
+                set(self.ids),
+                self,
+            )
+        return self._ballots.copy()
+
+    # hash of the candidates and rankings - equal profiles share one, however they were loaded
+    def fingerprint(self) -> str:
+        if self._fingerprint is None:
+            digest = hashlib.blake2b(repr(self.candidates).encode(), digest_size=16)
+            for values in (self.offsets, self.ids, self.tallies):
+                digest.update(array("q", values).tobytes())
+            self._fingerprint = digest.hexdigest()
+        return self._fingerprint
+
+    # translate a candidate id back to its name (anything else, like 'None', is left alone)
+    def name(self, candidate: Hashable) -> Hashable:
+        if not isinstance(candidate, int):
+            return candidate
+        return self.candidates[candidate]
+
+
+# ballots that know which candidates appear on them - computed once,
+# then kept up to date as candidates are eliminated (see 'remove_candidate').
+# 'profile' is the profile they were built from, while they still match it
+# (for builders that work on its arrays directly, see 'vectorized.py')
+class CandidateBallots(list[Ballot]):
+    def __init__(
+        self,
+        ballots: Iterable[Ballot] = (),
+        candidates: set[Hashable] | None = None,
+        profile: BallotProfile | None = None,
+    ) -> None:
+        super().__init__(ballots)
+        if candidates is None:
+            candidates = {c for ballot in self for c in ballot.ranking}
+        self.candidates: set[Hashable] = candidates
+        self.profile: BallotProfile | None = profile
+
+    def copy(self) -> "CandidateBallots":
+        return CandidateBallots(self, set(self.candidates), self.profile)
+
+
+# every candidate on 'ballots' - O(1) when they already know, a scan otherwise
+def candidates_of(ballots: Sequence[Ballot]) -> set[Hashable]:
+    if isinstance(ballots, CandidateBallots):
+        return ballots.candidates
+    return {c for ballot in ballots for c in ballot.ranking}
+
+
+# remove 'loser' from every ranking, dropping ballots left empty - only its first entry on
+# each, so a candidate ranked twice stays on the ballots (and in their candidates) for now.
+# removing a candidate often makes rankings identical, so with 'merge' they're combined
+# (see 'merge_duplicates')
+def remove_candidate(
+    ballots: Sequence[Ballot], loser: Hashable, merge: bool = False
+) -> CandidateBallots:
+    new_ballots: list[Ballot] = []
+    remains: bool = False
+    for ballot in ballots:
+        if loser in ballot.ranking:
+            temporary: list[Hashable] = list(ballot.ranking)
+            temporary.remove(loser)
+            remains = remains or loser in temporary
+            if len(temporary) != 0:
+                new_ballot: Ballot = Ballot(tuple(temporary), ballot.tally)
+                new_ballots.append(new_ballot)
+        else:
+            new_ballots.append(ballot)
+
+    candidates: set[Hashable] = set(candidates_of(ballots))
+    if not remains:
+        candidates.discard(loser)
+    result: CandidateBallots = CandidateBallots(new_ballots, candidates)
+    if merge:
+        merge_duplicates(result)
+    return result
+
+
+# cheap in-place merge for use between elimination rounds - no sorting, first-seen order
+# is kept so tie-breaking by ballot order doesn't change
+def merge_duplicates(ballots: list[Ballot]) -> None:
+    first: dict[tuple[Hashable, ...], int] = {}
+    merged: list[Ballot] = []
+    for ballot in ballots:
+        i: int | None = first.get(ballot.ranking)
+        if i is None:
+            first[ballot.ranking] = len(merged)
+            merged.append(ballot)
+        else:
+            merged[i] = merged[i]._replace(tally=merged[i].tally + ballot.tally)
+
+    ballots[:] = merged
+    if isinstance(ballots, CandidateBallots):
+        ballots.profile = None  # no longer the profile's ballots
+
+
+# candidate -> position in 'ranking' - a candidate ranked twice is at its first position,
+# as 'ranking.index' has it
+def first_positions(ranking: Sequence[Hashable]) -> dict[Hashable, int]:
+    positions: dict[Hashable, int] = {}
+    for i, c in enumerate(ranking):
+        positions.setdefault(c, i)
+    return positions
+
+
+# ballot with its candidate -> position lookup precomputed
+def ranked_ballot(ranking: tuple[Hashable, ...], tally: int) -> Ballot:
+    return Ballot(ranking, tally, first_positions(ranking))
+
+
+# candidate -> position lookup for a ballot - only built here if it wasn't at load time
+def rank_positions(ballot: Ballot) -> Mapping[Hashable, int]:
+    if ballot.positions is not None:
+        return ballot.positions
+    return first_positions(ballot.ranking)
+
+
+# a ballot's ranking as ids - a candidate ranked twice counts once, at its first position
+# (like 'rank_positions')
+def ranked_ids(ballot: Ballot, index: Mapping[Hashable, int]) -> list[int]:
+    ranked: list[int] = [index[c] for c in ballot.ranking]
+    if len(set(ranked)) != len(ranked):
+        ranked = list(dict.fromkeys(ranked))
+    return ranked
+
+
+# run 'scheme' over interned candidate ids, translating its winner back to a name - and
+# its best guess, if a budget stops it early (see 'budget.py')
+def interned(scheme: Callable[[list[Ballot]], Result]) -> Scheme:
+    @functools.wraps(scheme)
+    def run(ballots: Sequence[Ballot]) -> Result:
+        profile: BallotProfile = BallotProfile.of(ballots)
+        try:
+            winner, unique = scheme(profile.ballots())
+        except BudgetExceeded as error:
+            error.budget.best = profile.name(error.budget.best)
+            raise
+        return profile.name(winner), unique
+
+    return run
@@ -1,45 +1,133 @@
+import sys
 import argparse
-from typing import Hashable
+from contextlib import closing
+from typing import Callable, Hashable, Iterable, Iterator, Sequence
 
-from .types import Scheme, Election
+from .types import Ballot, Result, Scheme, Election
+from .canonical import canonicalize
+from .binary import BINARY_EXTENSION
 from .utility import (
-    read_corpus,
-    unmarshal_corpus,
-    unmarshal_elections,
-    write_elections,
-    read_election,
+    atomic_write,
+    iter_corpus,
+    iter_elections,
+    load_election,
     pretty_election_json,
+    record_results,
+    write_elections,
 )
+from .summary import SUMMARY_EXTENSION, ProfileSummary, SummaryScheme, load_summary
+from . import warehouse
+from . import pairwise
+from . import budget
+
+# whether each scheme run since 'shared_main' started finished inside its budget, for
+# '--results' - a winner from a run that didn't is reported, but not stored
+completed: list[bool] = []
 
 
 def do_corpus_file(
-    fname: str, name: str, scheme: Scheme, check: bool, overwrite: bool, verbose: bool
-):
+    fname: str,
+    name: str,
+    scheme: Scheme,
+    check: bool,
+    overwrite: bool,
+    verbose: bool,
+    canonical: bool = False,
+) -> list[Hashable]:
+    # elections are read and run one at a time
     with open(fname, "r") as f:
-        data = read_corpus(f)
-    corpus = unmarshal_corpus(data)
-    elections = corpus.elections
-    do_elections(name, scheme, check, overwrite, elections, verbose)
+        elections = iter_corpus(f, profile=True)
+        return do_elections(name, scheme, check, overwrite, elections, verbose, canonical)
 
 
 def do_elections_file(
-    fname: str, name: str, scheme: Scheme, check: bool, overwrite: bool, verbose: bool
-):
-    with open(fname, "r") as f:
-        data = read_corpus(f)
-    elections = unmarshal_elections(data)
-    do_elections(name, scheme, check, overwrite, elections, verbose)
-    if overwrite:
-        with open(fname, "w") as f:
-            write_elections(elections, f)
+    fname: str,
+    name: str,
+    scheme: Scheme,
+    check: bool,
+    overwrite: bool,
+    verbose: bool,
+    canonical: bool = False,
+) -> list[Hashable]:
+    # elections are read, run and (when overwriting) written back one at a time -
+    # the original file is only replaced once every election has been written
+    winners: list[Hashable] = []
+
+    def run(elections: Iterable[Election]) -> Iterator[Election]:
+        for election in elections:
+            winners.append(
+                do_election(name, scheme, check, overwrite, election, verbose, canonical)
+            )
+            yield election
+
+    if not overwrite:
+        with open(fname, "r") as f:
+            elections = iter_elections(f, profile=True)
+            return do_elections(name, scheme, check, overwrite, elections, verbose, canonical)
+
+    # the reader is closed before the new file replaces the old - Windows can't replace an
+    # open file
+    with atomic_write(fname) as out:
+        with open(fname, "r") as f:
+            write_elections(run(iter_elections(f, profile=True)), out)
+
+    return winners
 
 
 def do_election_file(
-    fname: str, name: str, scheme: Scheme, check: bool, overwrite: bool, verbose: bool
-):
-    with open(fname, "r") as f:
-        election = read_election(f)
-    return do_election(name, scheme, check, overwrite, election, verbose)
+    fname: str,
+    name: str,
+    scheme: Scheme,
+    check: bool,
+    overwrite: bool,
+    verbose: bool,
+    canonical: bool = False,
+    cache: bool = True,
+) -> Hashable:
+    election = load_election(fname, profile=True, cache=cache)
+    return do_election(name, scheme, check, overwrite, election, verbose, canonical)
+
+
+# an election from the academy warehouse - the result is stored alongside it
+def do_academy(
+    category: str,
+    year: int,
+    fname: str,
+    name: str,
+    scheme: Scheme,
+    verbose: bool,
+    canonical: bool = False,
+) -> Hashable:
+    with closing(warehouse.connect(fname)) as conn:
+        election = warehouse.read_election(conn, category, year)
+        winner = do_election(name, scheme, False, False, election, verbose, canonical)
+        if budget.last is None or budget.last.complete:  # a cut-short run isn't kept
+            with conn:
+                warehouse.record_result(
+                    conn, category, year, name, (winner, winner != "<AMBIGUOUS>")
+                )
+    return winner
+
+
+# a summary (see 'summary.py') - only schemes with a summary path can run from one
+def do_summary(fname: str, summary_scheme: SummaryScheme, verbose: bool) -> Hashable:
+    summary: ProfileSummary = load_summary(fname)
+    result = run_budgeted("summary", lambda: summary_scheme(summary))
+    winner: Hashable = result[0] if result[1] else "<AMBIGUOUS>"
+    if verbose:
+        print(f"{summary.voters} voters, {len(summary.candidates)} candidates")
+        print(result)
+    return winner
+
+
+# a scheme run under the '--time-limit' budget - a run it cut short is reported on stderr,
+# so the winner stays the only thing on stdout
+def run_budgeted(name: str, call: Callable[[], Result]) -> Result:
+    outcome: budget.Outcome = budget.run(call)
+    completed.append(outcome.complete)
+    if not outcome.complete:
+        print(f"{name}: incomplete - {outcome.progress}", file=sys.stderr)
+    return outcome.result
 
 
 def do_elections(
@@ -47,11 +135,14 @@ def do_elections(
     scheme: Scheme,
     check: bool,
     overwrite: bool,
-    elections: list[Election],
+    elections: Iterable[Election],
     verbose: bool,
-):
-    for election in elections:
-        do_election(name, scheme, check, overwrite, election, verbose)
+    canonical: bool = False,
+) -> list[Hashable]:
+    return [
+        do_election(name, scheme, check, overwrite, election, verbose, canonical)
+        for election in elections
+    ]
 
 
 def do_election(
@@ -61,9 +152,17 @@ def do_election(
     overwrite: bool,
     election: Election,
     verbose: bool,
+    canonical: bool = False,
 ):
-    result = scheme(election.ballots)
-    winner: str = result[0] if result[1] else "<AMBIGUOUS>"
+    # canonicalize a copy - an overwritten file keeps its original ballots
+    ballots: Sequence[Ballot] = election.ballots
+    if canonical:
+        ballots, shrinkage = canonicalize(ballots)
+        if verbose:
+            print(f"Canonical profile: {shrinkage}")
+
+    result = run_budgeted(name, lambda: scheme(ballots))
+    winner: Hashable = result[0] if result[1] else "<AMBIGUOUS>"
     if verbose:
         pretty = pretty_election_json(election)
         print(pretty)
@@ -81,45 +180,132 @@ def do_election(
         print("Computed winner:", result)
         print(f"Expected winner: {election.winners[name]}, actual winner: {result}")
         print()
-    if overwrite:
+    # a cut-short run isn't kept
+    if overwrite and (budget.last is None or budget.last.complete):
         election.winners[name] = winner
     return winner
 
 
-def shared_main(name: str, scheme: Scheme):
+def shared_main(name: str, scheme: Scheme, summary_scheme: SummaryScheme | None = None):
     args = parse_args()
+    pairwise.set_backend(args.backend)
+    budget.set_limit(args.time_limit)
+    completed.clear()
     if args.alias:
         name = args.alias
+    winner: Hashable = None  # only a single election has one winner to return
+    winners: list[Hashable]
     if args.election:
         winner = do_election_file(
-            args.election, name, scheme, args.check, args.overwrite, args.verbose
+            args.election,
+            name,
+            scheme,
+            args.check,
+            args.overwrite,
+            args.verbose,
+            args.canonical,
+            not args.no_cache,
         )
+        winners = [winner]
     elif args.elections:
-        do_elections_file(
-            args.elections, name, scheme, args.check, args.overwrite, args.verbose
+        winners = do_elections_file(
+            args.elections,
+            name,
+            scheme,
+            args.check,
+            args.overwrite,
+            args.verbose,
+            args.canonical,
         )
     elif args.corpus:
-        do_corpus_file(
-            args.corpus, name, scheme, args.check, args.overwrite, args.verbose
+        winners = do_corpus_file(
+            args.corpus,
+            name,
+            scheme,
+            args.check,
+            args.overwrite,
+            args.verbose,
+            args.canonical,
         )
+    elif args.academy:
+        category, year = args.academy
+        winner = do_academy(
+            category,
+            int(year),
+            args.warehouse,
+            name,
+            scheme,
+            args.verbose,
+            args.canonical,
+        )
+        winners = [winner]
+    elif args.summary:
+        if summary_scheme is None:
+            raise ValueError(f"{name} can't run from a summary")
+        winner = do_summary(args.summary, summary_scheme, args.verbose)
+        winners = [winner]
     else:
         raise ValueError("No input file specified")
+
+    if args.results:
+        record_results(args.results, name, winners, completed)
     return winner
 
 
 def parse_args():
     parser = argparse.ArgumentParser()
     group = parser.add_mutually_exclusive_group(required=True)
-    group.add_argument("--election", type=str, help="election file")
+    group.add_argument(
+        "--election", type=str, help=f"election file (JSON or {BINARY_EXTENSION})"
+    )
     group.add_argument("--elections", type=str, help="elections file")
     group.add_argument("--corpus", type=str, help="corpus file")
+    group.add_argument(
+        "--academy",
+        nargs=2,
+        metavar=("CATEGORY", "YEAR"),
+        help="election from the academy warehouse (see 'warehouse.py')",
+    )
+    group.add_argument(
+        "--summary",
+        type=str,
+        help=f"profile summary ({SUMMARY_EXTENSION}) or an election file to summarize",
+    )
     parser.add_argument("--output", type=str, help="output file")
+    parser.add_argument(
+        "--warehouse", type=str, default=warehouse.WAREHOUSE, help="academy warehouse file"
+    )
     parser.add_argument(
         "--overwrite", action="store_true", help="overwrite election values"
     )
     parser.add_argument("--verbose", action="store_true", help="print election values")
     parser.add_argument("--check", action="store_true", help="check election values")
     parser.add_argument("--alias", type=str, help="force new scheme name")
+    parser.add_argument(
+        "--canonical",
+        action="store_true",
+        help="merge identical rankings and drop empty ballots before running",
+    )
+    parser.add_argument(
+        "--no-cache", action="store_true", help="don't use the parsed election cache"
+    )
+    parser.add_argument(
+        "--backend",
+        choices=pairwise.BACKENDS,
+        default=pairwise.backend,
+        help="how pairwise and rank counts are built ('auto' uses numpy if installed)",
+    )
+    parser.add_argument(
+        "--time-limit",
+        type=float,
+        metavar="SECONDS",
+        help="stop each election after this long, with the scheme's best guess so far",
+    )
+    parser.add_argument(
+        "--results",
+        type=str,
+        help="record winners in a sidecar file (election index -> winners)",
+    )
 
     args = parser.parse_args()
     return args
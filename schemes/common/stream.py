@@ -0,0 +1,105 @@
+# Incremental JSON reading - one election at a time out of '--corpus' / '--elections' files
+# (see 'utility.iter_elections' and 'utility.iter_corpus')
+# pyright: strict
+#
+# the file is read in chunks and scanned event by event (object start, key, array item, ...);
+# each array item is decoded on its own, so only one election is held in memory at a time
+
+import json
+from typing import Any, Iterator, TextIO
+
+CHUNK_SIZE: int = 1 << 16
+WHITESPACE: str = " \t\n\r"
+DELIMITERS: str = WHITESPACE + ",:]}"
+
+
+class JSONStream:
+    def __init__(self, f: TextIO, chunk_size: int = CHUNK_SIZE) -> None:
+        self.f: TextIO = f
+        self.chunk_size: int = chunk_size
+        self.buffer: str = ""
+        self.position: int = 0
+        self.eof: bool = False
+        self.decoder: json.JSONDecoder = json.JSONDecoder()
+
+    # read more of the file, dropping what has been consumed - reads at least as much as
+    # is buffered so a large value is re-scanned a logarithmic number of times
+    def fill(self) -> bool:
+        if self.eof:
+            return False
+        pending: str = self.buffer[self.position :]
+        chunk: str = self.f.read(max(self.chunk_size, len(pending)))
+        if not chunk:
+            self.eof = True
+        self.buffer = pending + chunk
+        self.position = 0
+        return bool(chunk)
+
+    # next non-whitespace character, without consuming it ('' at the end of the file)
+    def peek(self) -> str:
+        while True:
+            while self.position < len(self.buffer) and self.buffer[self.position] in WHITESPACE:
+                self.position += 1
+            if self.position < len(self.buffer):
+                return self.buffer[self.position]
+            if not self.fill():
+                return ""
+
+    def expect(self, char: str) -> None:
+        found: str = self.peek()
+        if found != char:
+            raise ValueError(f"expected '{char}' but found '{found or 'end of file'}'")
+        self.position += 1
+
+    # decode one whole value - a value running into the end of the buffer may be cut short
+    # (an incomplete object, or a number like '6.' or '6.5e' that decodes as '6'), so until
+    # a delimiter follows it, read more and try again
+    def value(self) -> Any:
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.position)
+            except json.JSONDecodeError:
+                if self.fill():
+                    continue
+                raise
+            if (end == len(self.buffer) or self.buffer[end] not in DELIMITERS) and self.fill():
+                continue
+            self.position = end
+            return value
+
+    # items of the array starting here
+    def items(self) -> Iterator[Any]:
+        self.expect("[")
+        if self.peek() == "]":
+            self.position += 1
+            return
+        while True:
+            yield self.value()
+            if self.peek() == ",":
+                self.position += 1
+            else:
+                self.expect("]")
+                return
+
+    # items of the array under 'key' in the object starting here - the object's
+    # other members go into 'header' as they are passed
+    def member_items(self, key: str, header: dict[str, Any]) -> Iterator[Any]:
+        self.expect("{")
+        if self.peek() == "}":
+            self.position += 1
+            return
+        while True:
+            member: str = self.value()
+            self.expect(":")
+            if member == key:
+                yield from self.items()
+            else:
+                header[member] = self.value()
+
+            if self.peek() == ",":
+                self.position += 1
+            else:
+                self.expect("}")
+                return
+
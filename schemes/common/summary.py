@@ -0,0 +1,178 @@
+# Profile summaries - the statistics most schemes need, without the ballots
+# pyright: strict
+#
+# a summary holds the pairwise matrix (see 'pairwise.py'), the candidate x rank counts,
+# how many votes rank each candidate at all and the total number of voters. summaries of
+# separate ballot shards add up to the summary of all of them, and are small enough to
+# keep instead of the ballots. schemes that only need these statistics take a summary
+# with '--summary' (their 'summary_scheme').
+#
+# usage (from 'schemes'): python -m common.summary OUTPUT INPUT [INPUT...]
+# each input is an election file (JSON or binary) or another summary - all are added up
+
+import json
+import argparse
+from typing import Any, Callable, Hashable, Sequence, TextIO
+
+from .types import Ballot, Result
+from .profile import BallotProfile, ranked_ids
+from .pairwise import pairwise_matrix, rank_counts
+from .utility import atomic_write, load_election
+
+SUMMARY_EXTENSION: str = ".summary.json"
+
+
+class ProfileSummary:
+    def __init__(
+        self,
+        candidates: list[Hashable],
+        voters: int,
+        mentions: list[int],
+        pairwise: list[list[int]],
+        positions: list[list[int]],
+    ) -> None:
+        self.candidates: list[Hashable] = candidates
+        self.voters: int = voters
+        # 'mentions[c]' - votes ranking candidates[c] anywhere
+        self.mentions: list[int] = mentions
+        # 'pairwise[c][d]' - votes ranking candidates[c] over candidates[d]
+        self.pairwise: list[list[int]] = pairwise
+        # 'positions[c][k]' - votes ranking candidates[c] in position k
+        self.positions: list[list[int]] = positions
+
+    @classmethod
+    def from_ballots(cls, ballots: Sequence[Ballot]) -> "ProfileSummary":
+        profile: BallotProfile = BallotProfile.of(ballots)
+        interned: Sequence[Ballot] = profile.ballots()
+        ids: list[Hashable] = list(range(len(profile.candidates)))
+        index: dict[Hashable, int] = {c: i for i, c in enumerate(ids)}
+
+        mentions: list[int] = [0] * len(ids)
+        for ballot in interned:
+            for c in ranked_ids(ballot, index):
+                mentions[c] += ballot.tally
+
+        return cls(
+            list(profile.candidates),
+            sum(profile.tallies),
+            mentions,
+            pairwise_matrix(interned, ids),
+            rank_counts(interned, ids),
+        )
+
+    # votes ranking each candidate first
+    def first_preferences(self) -> list[int]:
+        return [row[0] if row else 0 for row in self.positions]
+
+    # the same statistics over 'candidates' (a superset of this summary's) - a candidate
+    # no ballot ranked loses to everyone who was ranked, and has no counts of its own
+    def widened(self, candidates: list[Hashable], width: int) -> "ProfileSummary":
+        index: dict[Hashable, int] = {c: i for i, c in enumerate(self.candidates)}
+        where: list[int | None] = [index.get(c) for c in candidates]
+
+        pairwise: list[list[int]] = []
+        positions: list[list[int]] = []
+        for i in where:
+            if i is None:
+                pairwise.append([0] * len(candidates))
+                positions.append([0] * width)
+                continue
+            row: list[int] = self.pairwise[i]
+            pairwise.append(
+                [
+                    0 if j == i else self.mentions[i] if j is None else row[j]
+                    for j in where
+                ]
+            )
+            positions.append(self.positions[i] + [0] * (width - len(self.positions[i])))
+
+        mentions: list[int] = [0 if i is None else self.mentions[i] for i in where]
+        return ProfileSummary(candidates, self.voters, mentions, pairwise, positions)
+
+    def __add__(self, other: "ProfileSummary") -> "ProfileSummary":
+        candidates: list[Hashable] = list(self.candidates)
+        known: set[Hashable] = set(candidates)
+        candidates.extend(c for c in other.candidates if c not in known)
+        width: int = max(
+            (len(row) for row in self.positions + other.positions), default=0
+        )
+
+        a: ProfileSummary = self.widened(candidates, width)
+        b: ProfileSummary = other.widened(candidates, width)
+        return ProfileSummary(
+            candidates,
+            a.voters + b.voters,
+            [x + y for x, y in zip(a.mentions, b.mentions)],
+            [[x + y for x, y in zip(r, s)] for r, s in zip(a.pairwise, b.pairwise)],
+            [[x + y for x, y in zip(r, s)] for r, s in zip(a.positions, b.positions)],
+        )
+
+    def to_json(self) -> dict[str, Any]:
+        return {
+            "candidates": self.candidates,
+            "voters": self.voters,
+            "mentions": self.mentions,
+            "pairwise": self.pairwise,
+            "positions": self.positions,
+        }
+
+    @classmethod
+    def from_json(cls, data: dict[str, Any]) -> "ProfileSummary":
+        return cls(
+            data["candidates"],
+            data["voters"],
+            data["mentions"],
+            data["pairwise"],
+            data["positions"],
+        )
+
+
+SummaryScheme = Callable[[ProfileSummary], Result]
+
+
+def is_summary(fname: str) -> bool:
+    return fname.endswith(SUMMARY_EXTENSION)
+
+
+def read_summary(f: TextIO) -> ProfileSummary:
+    return ProfileSummary.from_json(json.load(f))
+
+
+# one row per line, so large summaries stay readable
+def write_summary(summary: ProfileSummary, f: TextIO):
+    data: dict[str, Any] = summary.to_json()
+    f.write("{\n")
+    for i, (key, value) in enumerate(data.items()):
+        f.write(f"{json.dumps(key)}: ")
+        if key in ("pairwise", "positions"):
+            f.write("[\n" + ",\n".join(json.dumps(row) for row in value) + "\n]")
+        else:
+            f.write(json.dumps(value, ensure_ascii=False))
+        f.write(",\n" if i != len(data) - 1 else "\n")
+    f.write("}\n")
+
+
+def load_summary(fname: str) -> ProfileSummary:
+    if is_summary(fname):
+        with open(fname, "r", encoding="utf-8") as f:
+            return read_summary(f)
+    return ProfileSummary.from_ballots(load_election(fname, profile=True).ballots)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="summarize (and add up) elections")
+    parser.add_argument("output", help=f"summary file ({SUMMARY_EXTENSION})")
+    parser.add_argument("inputs", nargs="+", help="election files or summaries")
+    args = parser.parse_args()
+
+    total: ProfileSummary = load_summary(args.inputs[0])
+    for fname in args.inputs[1:]:
+        total = total + load_summary(fname)
+
+    with atomic_write(args.output) as f:
+        write_summary(total, f)
+    print(f"{len(args.inputs)} inputs, {len(total.candidates)} candidates -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+# Tournaments - the majority graph of a pairwise matrix and the sets read off its
+# strongly connected components (Smith set, Schwartz set, Condorcet winner)
+# pyright: strict
+#
+# every function takes 'votes[i][j]' (see 'pairwise.py') and runs in O(C^2) - except the
+# strongest paths, which are O(C^3) (vectorized with numpy, see 'pairwise.strongest_paths').
+# candidates are matrix indices. tarjan's algorithm returns the components sinks first,
+# so the components nobody outside beats come last
+#
+# usage (from 'schemes'): python -m common.tournament [election files...]
+# prints the smith and schwartz sets of each file
+
+import argparse
+from typing import Hashable, Sequence
+
+from .types import Ballot
+
+
+# 'graph[i]' - the candidates a majority ranks candidates[i] over
+def beats(votes: list[list[int]]) -> list[list[int]]:
+    size: int = len(votes)
+    return [[j for j in range(size) if votes[i][j] > votes[j][i]] for i in range(size)]
+
+
+# the same, plus the candidates candidates[i] ties with
+def beats_or_ties(votes: list[list[int]]) -> list[list[int]]:
+    size: int = len(votes)
+    return [
+        [j for j in range(size) if j != i and votes[i][j] >= votes[j][i]]
+        for i in range(size)
+    ]
+
+
+# tarjan's strongly connected components, in reverse topological order (iterative, so
+# hundreds of candidates don't hit the recursion limit)
+def components(graph: list[list[int]]) -> list[list[int]]:
+    size: int = len(graph)
+    order: list[int] = [-1] * size  # when each node was first reached
+    low: list[int] = [0] * size
+    on_stack: list[bool] = [False] * size
+    stack: list[int] = []
+    found: list[list[int]] = []
+    counter: int = 0
+
+    for root in range(size):
+        if order[root] != -1:
+            continue
+
+        # (node, index of the next edge to follow)
+        work: list[tuple[int, int]] = [(root, 0)]
+        while work:
+            node, edge = work.pop()
+            if edge == 0:
+                order[node] = low[node] = counter
+                counter += 1
+                stack.append(node)
+                on_stack[node] = True
+
+            # follow edges until one reaches an unvisited node
+            descended: bool = False
+            edges: list[int] = graph[node]
+            while edge < len(edges):
+                nxt: int = edges[edge]
+                edge += 1
+                if order[nxt] == -1:
+                    work.append((node, edge))
+                    work.append((nxt, 0))
+                    descended = True
+                    break
+                if on_stack[nxt]:
+                    low[node] = min(low[node], order[nxt])
+            if descended:
+                continue
+
+            # every edge followed - pop a component if this node is its root
+            if low[node] == order[node]:
+                component: list[int] = []
+                while True:
+                    member: int = stack.pop()
+                    on_stack[member] = False
+                    component.append(member)
+                    if member == node:
+                        break
+                found.append(sorted(component))
+            if work:
+                parent: int = work[-1][0]
+                low[parent] = min(low[parent], low[node])
+
+    return found
+
+
+# smallest set whose members each beat everyone outside it - ties keep a candidate in,
+# so it's the one component of 'beats_or_ties' nothing outside reaches
+def smith_set(votes: list[list[int]]) -> list[int]:
+    found: list[list[int]] = components(beats_or_ties(votes))
+    return found[-1] if found else []
+
+
+# union of the smallest sets nobody outside beats - the components of 'beats' without
+# a majority against them from outside
+def schwartz_set(votes: list[list[int]]) -> list[int]:
+    graph: list[list[int]] = beats(votes)
+    found: list[list[int]] = components(graph)
+    component: list[int] = [0] * len(votes)
+    for k, members in enumerate(found):
+        for i in members:
+            component[i] = k
+
+    beaten: set[int] = {
+        component[j]
+        for i in range(len(graph))
+        for j in graph[i]
+        if component[i] != component[j]
+    }
+    return sorted(i for k, members in enumerate(found) if k not in beaten for i in members)
+
+
+# the candidate who beats everyone else, if there is one
+def condorcet_winner(votes: list[list[int]]) -> int | None:
+    size: int = len(votes)
+    for i, row in enumerate(beats(votes)):
+        if len(row) == size - 1:
+            return i
+    return None
+
+
+# strongest paths (floyd-warshall, widest path) - 'paths[i][j]' is the weakest link of the
+# strongest chain of 'defeats' from candidates[i] to candidates[j]
+def strongest_paths(defeats: list[list[int]]) -> list[list[int]]:
+    size: int = len(defeats)
+    paths: list[list[int]] = [row[:] for row in defeats]
+    for k in range(size):
+        through: list[int] = paths[k]
+        for i in range(size):
+            via: int = paths[i][k]
+            if i == k or via == 0:
+                continue
+            paths[i] = [
+                p if p >= via else max(p, min(via, t)) for p, t in zip(paths[i], through)
+            ]
+
+    for i in range(size):
+        paths[i][i] = 0
+    return paths
+
+
+# tiers of candidates, best first - each tier is everyone left that no remaining candidate
+# beats by 'paths' (the relation is transitive, so every round finds someone)
+def layers(paths: list[list[int]]) -> list[list[int]]:
+    size: int = len(paths)
+    beaten_by: list[int] = [
+        sum(1 for j in range(size) if paths[j][i] > paths[i][j]) for i in range(size)
+    ]
+
+    tiers: list[list[int]] = []
+    remaining: set[int] = set(range(size))
+    while remaining:
+        tier: list[int] = sorted(i for i in remaining if beaten_by[i] == 0)
+        if not tier:
+            tier = sorted(remaining)  # not transitive after all - keep the rest together
+        tiers.append(tier)
+        remaining.difference_update(tier)
+        for i in tier:
+            for j in remaining:
+                if paths[i][j] > paths[j][i]:
+                    beaten_by[j] -= 1
+
+    return tiers
+
+
+def main():
+    from .utility import load_election  # here, since 'utility' is only needed to print
+    from .pairwise import pairwise_matrix
+
+    parser = argparse.ArgumentParser(description="smith and schwartz sets")
+    parser.add_argument("files", nargs="+", help="election files (JSON or binary)")
+    args = parser.parse_args()
+
+    for fname in args.files:
+        ballots: Sequence[Ballot] = load_election(fname, profile=True).ballots
+        candidates: list[Hashable] = sorted({c for b in ballots for c in b.ranking}, key=str)
+        votes: list[list[int]] = pairwise_matrix(ballots, candidates)
+        print(f"{fname}: {len(candidates)} candidates")
+        print(f"  smith:    {[candidates[i] for i in smith_set(votes)]}")
+        print(f"  schwartz: {[candidates[i] for i in schwartz_set(votes)]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,11 @@
-from typing import Hashable, NamedTuple, Callable
+from typing import Hashable, NamedTuple, Callable, Mapping, Sequence
 
 
 class Ballot(NamedTuple):
     ranking: tuple[Hashable, ...]
     tally: int
+    # candidate -> index in 'ranking', built once at load time (see 'profile.rank_positions')
+    positions: Mapping[Hashable, int] | None = None
 
 
 # first element is the winner,
@@ -11,8 +13,9 @@ class Ballot(NamedTuple):
 Result = tuple[Hashable | None, bool]
 
 
+# 'ballots' is either a plain list or an interned 'BallotProfile' (see 'profile.py')
 class Election(NamedTuple):
-    ballots: list[Ballot]
+    ballots: Sequence[Ballot]
     winners: dict[str, Hashable]
 
 
@@ -25,4 +28,4 @@ class Corpus(NamedTuple):
     elections: list[Election]
 
 
-Scheme = Callable[[list[Ballot]], Result]
+Scheme = Callable[[Sequence[Ballot]], Result]
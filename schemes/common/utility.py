@@ -1,20 +1,41 @@
+import io
+import os
 import sys
 import json
-from typing import Any, Hashable
+import shutil
+import tempfile
+from contextlib import contextmanager
+from typing import Any, Hashable, Iterable, Iterator, Sequence, TextIO
 from io import TextIOWrapper
 
 from .types import Ballot, Election, Corpus
+from .profile import BallotProfile, ranked_ballot
+from .canonical import canonicalize
+from .binary import is_binary, read_binary_election
+from .cache import cached_election
+from .stream import JSONStream
+from .validate import Limits, Violation, validate_corpus, validate_elections
 
 
 def pretty_ballot_json(ballot: Ballot) -> str:
-    return f'{{ "count":{ballot.tally:3}, "ranking": {list(ballot.ranking)} }}'
+    ranking: str = json.dumps(list(ballot.ranking), ensure_ascii=False)
+    return f'{{ "count":{ballot.tally:3}, "ranking": {ranking} }}'
 
 
 def pretty_election_json(election: Election) -> str:
-    prologue = '{ "ballots": [\n'
-    ballots = ",\n".join(pretty_ballot_json(b) for b in election.ballots)
-    epilogue = f'],\n"winners": {json.dumps(election.winners,sort_keys=True)} }}'
-    return prologue + ballots + epilogue
+    f = io.StringIO()
+    write_election_json(election, f)
+    return f.getvalue()
+
+
+# same as 'pretty_election_json', written ballot by ballot instead of joined first
+def write_election_json(election: Election, f: TextIO):
+    f.write('{ "ballots": [\n')
+    for i, ballot in enumerate(election.ballots):
+        if i != 0:
+            f.write(",\n")
+        f.write(pretty_ballot_json(ballot))
+    f.write(f'],\n"winners": {json.dumps(election.winners,sort_keys=True)} }}')
 
 
 def check_corpus(
@@ -24,23 +45,23 @@ def check_corpus(
     max_ranking_length: int,
     min_ranking_length: int,
     max_unique_rankings: int,
-):
-    assert data["num_candidates"] == num_candidates
-    assert data["num_voters"] == num_voters
-    assert data["max_ranking_length"] == max_ranking_length
-    assert data["min_ranking_length"] == min_ranking_length
-    assert data["max_unique_rankings"] == max_unique_rankings
-
-    for election in data["elections"]:
-        ballots = election["ballots"]
-        check_ballots(
-            num_candidates,
-            num_voters,
-            max_ranking_length,
-            min_ranking_length,
-            max_unique_rankings,
-            ballots,
-        )
+) -> list[Violation]:
+    limits = Limits(
+        num_candidates,
+        num_voters,
+        max_ranking_length,
+        min_ranking_length,
+        max_unique_rankings,
+    )
+    violations: list[Violation] = [
+        Violation(field, None, None, f"is {data.get(field)}, expected {expected}")
+        for field, expected in limits._asdict().items()
+        if data.get(field) != expected
+    ]
+
+    elections = (election["ballots"] for election in data["elections"])
+    violations.extend(validate_elections(elections, limits._asdict()))
+    return violations
 
 
 def check_ballots(
@@ -50,31 +71,19 @@ def check_ballots(
     min_ranking_length: int,
     max_unique_rankings: int,
     ballots: list[dict[str, Any]],
-):
-    assert all(len(b["ranking"]) <= max_ranking_length for b in ballots)
-    assert all(len(b["ranking"]) >= min_ranking_length for b in ballots)
-    assert len(set(c for b in ballots for c in b["ranking"])) <= num_candidates
-    assert len(set(tuple(b["ranking"]) for b in ballots)) <= max_unique_rankings
-    assert sum(b["count"] for b in ballots) == num_voters
-    assert all(b["count"] >= 0 for b in ballots)
-    assert all(len(b["ranking"]) == len(set(b["ranking"])) for b in ballots)
-
-
-def check_corpus_consistency(data: Any):
-    num_voters = data["num_voters"]
-    num_candidates = data["num_candidates"]
-    max_ranking_length = data["max_ranking_length"]
-    min_ranking_length = data["min_ranking_length"]
-    max_unique_rankings = data["max_unique_rankings"]
-
-    check_corpus(
-        data,
+) -> list[Violation]:
+    limits = Limits(
         num_candidates,
         num_voters,
         max_ranking_length,
         min_ranking_length,
         max_unique_rankings,
     )
+    return list(validate_elections([ballots], limits._asdict()))
+
+
+def check_corpus_consistency(data: Any) -> list[Violation]:
+    return validate_corpus(data)
 
 
 def read_corpus(f: TextIOWrapper):
@@ -82,31 +91,86 @@ def read_corpus(f: TextIOWrapper):
     return data
 
 
-def unmarshal_corpus(data: Any) -> Corpus:
+def unmarshal_corpus(data: Any, profile: bool = False, canonical: bool = False) -> Corpus:
     return Corpus(
         num_candidates=data["num_candidates"],
         num_voters=data["num_voters"],
         max_ranking_length=data["max_ranking_length"],
         min_ranking_length=data["min_ranking_length"],
         max_unique_rankings=data["max_unique_rankings"],
-        elections=elections_from_corpus(data),
+        elections=elections_from_corpus(data, profile, canonical),
     )
 
 
-def elections_from_corpus(data: Any) -> list[Election]:
-    return [unmarshal_election(election) for election in data["elections"]]
+def elections_from_corpus(
+    data: Any, profile: bool = False, canonical: bool = False
+) -> list[Election]:
+    return [
+        unmarshal_election(election, profile, canonical) for election in data["elections"]
+    ]
 
 
-def unmarshal_elections(data: Any) -> list[Election]:
-    return [unmarshal_election(election) for election in data]
+def unmarshal_elections(
+    data: Any, profile: bool = False, canonical: bool = False
+) -> list[Election]:
+    return [unmarshal_election(election, profile, canonical) for election in data]
 
 
-def write_elections(elections: list[Election], f: TextIOWrapper):
+# elections are written as they come, so 'elections' can be a generator
+def write_elections(elections: Iterable[Election], f: TextIO):
     f.write("[\n")
-    f.write(",\n".join(pretty_election_json(election) for election in elections))
+    for i, election in enumerate(elections):
+        if i != 0:
+            f.write(",\n")
+        write_election_json(election, f)
     f.write("\n]\n")
 
 
+# write to a temporary file next to 'fname' that only replaces it once it is complete
+@contextmanager
+def atomic_write(fname: str) -> Iterator[TextIO]:
+    directory: str = os.path.dirname(os.path.abspath(fname))
+    descriptor, temporary = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(descriptor, "w", encoding="utf-8") as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        if os.path.exists(fname):
+            shutil.copymode(fname, temporary)  # 'mkstemp' files are private
+        os.replace(temporary, fname)
+    except BaseException:
+        os.remove(temporary)
+        raise
+
+
+# sidecar results file - election index -> {scheme name: winner}, so recording a
+# scheme's winners doesn't rewrite the ballots
+def read_results(fname: str) -> dict[str, dict[str, Hashable]]:
+    try:
+        with open(fname, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+# winners whose 'complete' is false (cut short by a budget) are left as they were
+def record_results(
+    fname: str,
+    name: str,
+    winners: Sequence[Hashable],
+    complete: Sequence[bool] | None = None,
+):
+    results: dict[str, dict[str, Hashable]] = read_results(fname)
+    for i, winner in enumerate(winners):
+        if complete is None or complete[i]:
+            results.setdefault(str(i), {})[name] = winner
+
+    with atomic_write(fname) as f:
+        json.dump(results, f, indent=2, sort_keys=True, ensure_ascii=False)
+        f.write("\n")
+
+
 def write_corpus(corpus: Any, f: TextIOWrapper):
     json.dump(corpus, f, indent=4)
 
@@ -123,12 +187,30 @@ def marshal_election(election: Election) -> dict[str, Any]:
 
 
 def unmarshal_ballot(ballot: dict[str, Any]):
-    return Ballot(tuple(ballot["ranking"]), ballot["count"])
+    return ranked_ballot(tuple(ballot["ranking"]), ballot["count"])
+
 
+# 'profile' interns the candidates into an array-backed 'BallotProfile',
+# 'canonical' merges identical rankings and drops empty ballots (see 'canonical.py')
+def unmarshal_ballots(
+    data: Any, profile: bool = False, canonical: bool = False
+) -> Sequence[Ballot]:
+    ballots: Sequence[Ballot]
+    if profile:
+        ballots = BallotProfile.from_ballots(unmarshal_ballot(b) for b in data)
+    else:
+        ballots = [unmarshal_ballot(b) for b in data]
 
-def unmarshal_election(data: Any) -> Election:
+    if canonical:
+        ballots, _ = canonicalize(ballots)
+    return ballots
+
+
+def unmarshal_election(
+    data: Any, profile: bool = False, canonical: bool = False
+) -> Election:
     return Election(
-        [unmarshal_ballot(b) for b in data["ballots"]],
+        unmarshal_ballots(data["ballots"], profile, canonical),
         data["winners"] if "winners" in data else {},
     )
 
@@ -138,22 +220,75 @@ def read_list_of_ballots(f: TextIOWrapper) -> list[Ballot]:
     return [unmarshal_ballot(b) for b in data]
 
 
-def json_to_Election(data: Any) -> Election:
-    ballots = [unmarshal_ballot(b) for b in data["ballots"]]
+def json_to_Election(data: Any, profile: bool = False, canonical: bool = False) -> Election:
+    ballots = unmarshal_ballots(data["ballots"], profile, canonical)
     winners: dict[str, Hashable] = data["winners"] if "winners" in data else {}
     return Election(ballots, winners)
 
 
-def read_election(f: TextIOWrapper) -> Election:
+# binary ballot files (see 'binary.py') are recognized by the name of 'f'
+def read_election(
+    f: TextIOWrapper, profile: bool = False, canonical: bool = False
+) -> Election:
+    if is_binary(getattr(f, "name", "")):
+        return load_election(f.name, profile, canonical)
+
     data = json.load(f)
-    election = json_to_Election(data)
+    election = json_to_Election(data, profile, canonical)
     return election
 
 
+# read an election file of either format - binary files always load as a profile.
+# with 'cache', parsed JSON profiles are kept on disk (see 'cache.py')
+def load_election(
+    fname: str, profile: bool = False, canonical: bool = False, cache: bool = False
+) -> Election:
+    election: Election
+    if is_binary(fname):
+        election = read_binary_election(fname)
+    elif cache and profile:
+        election = cached_election(fname, lambda data: json_to_Election(data, True))
+    else:
+        with open(fname, "r", encoding="utf-8") as f:
+            return read_election(f, profile, canonical)
+
+    if canonical:
+        ballots, _ = canonicalize(election.ballots)
+        election = election._replace(ballots=ballots)
+    return election
+
+
+# elections of an '--elections' file (a top-level list), read one at a time
+def iter_elections(f: TextIO, profile: bool = False) -> Iterator[Election]:
+    for data in JSONStream(f).items():
+        yield unmarshal_election(data, profile)
+
+
+# elections of a '--corpus' file, read one at a time - the corpus fields
+# ('num_voters', ...) are put into 'header' as they are read
+def iter_corpus(
+    f: TextIO, profile: bool = False, header: dict[str, Any] | None = None
+) -> Iterator[Election]:
+    members: dict[str, Any] = {} if header is None else header
+    for data in JSONStream(f).member_items("elections", members):
+        yield unmarshal_election(data, profile)
+
+
+# validate a corpus on stdin as it streams in, reporting every violation
 def main():
     tiow = TextIOWrapper(sys.stdin.buffer, encoding="utf-8")
-    data = read_corpus(tiow)
-    check_corpus_consistency(data)
+    header: dict[str, Any] = {}
+    elections = JSONStream(tiow).member_items("elections", header)
+    ballots = (election["ballots"] for election in elections)
+
+    violations: int = 0
+    for violation in validate_elections(ballots, header):
+        print(violation)
+        violations += 1
+
+    if violations != 0:
+        print(f"{violations} violations found")
+        sys.exit(1)
 
 
 if __name__ == "__main__":
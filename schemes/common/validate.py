@@ -0,0 +1,191 @@
+# Corpus validation - every invariant checked in one pass over each election's profile
+# pyright: strict
+#
+# checks: ranking lengths within [min_ranking_length, max_ranking_length], at most
+# num_candidates candidates and max_unique_rankings distinct rankings, tallies summing to
+# num_voters, no negative tallies and no candidate ranked twice on a ballot.
+# every violation is reported with where it was found, instead of stopping at the first
+
+from typing import Any, Iterable, Iterator, NamedTuple
+
+from .types import Ballot
+from .profile import BallotProfile
+
+
+class Violation(NamedTuple):
+    check: str
+    election: int | None
+    ballot: int | None
+    detail: str
+
+    def __str__(self) -> str:
+        where: str = "corpus"
+        if self.election is not None:
+            where = f"election {self.election}"
+        if self.ballot is not None:
+            where += f", ballot {self.ballot}"
+        return f"{where}: {self.check} - {self.detail}"
+
+
+# corpus-wide limits - 'None' means unchecked
+class Limits(NamedTuple):
+    num_candidates: int | None
+    num_voters: int | None
+    max_ranking_length: int | None
+    min_ranking_length: int | None
+    max_unique_rankings: int | None
+
+
+def limits_from(data: dict[str, Any]) -> Limits:
+    return Limits(
+        data.get("num_candidates"),
+        data.get("num_voters"),
+        data.get("max_ranking_length"),
+        data.get("min_ranking_length"),
+        data.get("max_unique_rankings"),
+    )
+
+
+# what an election's single pass found - kept for checks whose limits aren't known yet
+class ElectionStats(NamedTuple):
+    election: int
+    longest: tuple[int, int]  # (length, ballot)
+    shortest: tuple[int, int]
+    num_candidates: int
+    unique_rankings: int
+    num_voters: int
+
+
+def profile_from(ballots: Iterable[dict[str, Any]]) -> BallotProfile:
+    return BallotProfile.from_ballots(Ballot(tuple(b["ranking"]), b["count"]) for b in ballots)
+
+
+# one pass over the profile's arrays - per-ballot violations are yielded as found,
+# length limits are only checked here when they are already known
+def scan_election(
+    election: int, profile: BallotProfile, limits: Limits, stats: list[ElectionStats]
+) -> Iterator[Violation]:
+    offsets, ids, tallies = profile.offsets, profile.ids, profile.tallies
+    longest: tuple[int, int] = (-1, -1)
+    shortest: tuple[int, int] = (-1, -1)
+    rankings: set[tuple[int, ...]] = set()
+    voters: int = 0
+
+    for i in range(len(tallies)):
+        ranking: tuple[int, ...] = tuple(ids[offsets[i] : offsets[i + 1]])
+        length: int = len(ranking)
+        tally: int = tallies[i]
+
+        if limits.max_ranking_length is not None and length > limits.max_ranking_length:
+            yield Violation(
+                "max_ranking_length",
+                election,
+                i,
+                f"ranks {length} candidates, at most {limits.max_ranking_length} allowed",
+            )
+        if limits.min_ranking_length is not None and length < limits.min_ranking_length:
+            yield Violation(
+                "min_ranking_length",
+                election,
+                i,
+                f"ranks {length} candidates, at least {limits.min_ranking_length} required",
+            )
+        if tally < 0:
+            yield Violation("count", election, i, f"negative count {tally}")
+        if len(set(ranking)) != length:
+            yield Violation("duplicates", election, i, "a candidate is ranked more than once")
+
+        if length > longest[0]:
+            longest = (length, i)
+        if shortest[0] == -1 or length < shortest[0]:
+            shortest = (length, i)
+        rankings.add(ranking)
+        voters += tally
+
+    stats.append(
+        ElectionStats(
+            election, longest, shortest, len(profile.candidates), len(rankings), voters
+        )
+    )
+
+
+# checks on an election's totals - length limits already known during the scan ('scanned')
+# were checked ballot by ballot, the others are checked against the extreme ballots
+def check_stats(stats: ElectionStats, limits: Limits, scanned: Limits) -> Iterator[Violation]:
+    election: int = stats.election
+    if stats.longest[1] != -1:
+        length, ballot = stats.longest
+        if (
+            scanned.max_ranking_length is None
+            and limits.max_ranking_length is not None
+            and length > limits.max_ranking_length
+        ):
+            yield Violation(
+                "max_ranking_length",
+                election,
+                ballot,
+                f"longest ballot ranks {length} candidates, at most {limits.max_ranking_length} allowed",
+            )
+        length, ballot = stats.shortest
+        if (
+            scanned.min_ranking_length is None
+            and limits.min_ranking_length is not None
+            and length < limits.min_ranking_length
+        ):
+            yield Violation(
+                "min_ranking_length",
+                election,
+                ballot,
+                f"shortest ballot ranks {length} candidates, at least {limits.min_ranking_length} required",
+            )
+    if limits.num_candidates is not None and stats.num_candidates > limits.num_candidates:
+        yield Violation(
+            "num_candidates",
+            election,
+            None,
+            f"{stats.num_candidates} candidates, at most {limits.num_candidates} allowed",
+        )
+    if (
+        limits.max_unique_rankings is not None
+        and stats.unique_rankings > limits.max_unique_rankings
+    ):
+        yield Violation(
+            "max_unique_rankings",
+            election,
+            None,
+            f"{stats.unique_rankings} unique rankings, at most {limits.max_unique_rankings} allowed",
+        )
+    if limits.num_voters is not None and stats.num_voters != limits.num_voters:
+        yield Violation(
+            "num_voters",
+            election,
+            None,
+            f"{stats.num_voters} voters, expected {limits.num_voters}",
+        )
+
+
+# validate elections as they stream past - 'header' holds the corpus fields read so far
+# (see 'stream.iter_corpus'), so limits are used as soon as they have been seen
+def validate_elections(
+    elections: Iterable[Iterable[dict[str, Any]]], header: dict[str, Any]
+) -> Iterator[Violation]:
+    deferred: list[tuple[ElectionStats, Limits]] = []
+    for election, ballots in enumerate(elections):
+        limits: Limits = limits_from(header)
+        stats: list[ElectionStats] = []
+        yield from scan_election(election, profile_from(ballots), limits, stats)
+
+        if None in limits:
+            deferred.append((stats[0], limits))  # some fields come after the elections
+        else:
+            yield from check_stats(stats[0], limits, limits)
+
+    final: Limits = limits_from(header)
+    for waiting, scanned in deferred:
+        yield from check_stats(waiting, final, scanned)
+
+
+def validate_corpus(data: dict[str, Any]) -> list[Violation]:
+    header: dict[str, Any] = {k: v for k, v in data.items() if k != "elections"}
+    elections = (election["ballots"] for election in data["elections"])
+    return list(validate_elections(elections, header))
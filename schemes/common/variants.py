@@ -0,0 +1,114 @@
+# Copeland and Minimax variants - every common variant's scores and winners from one
+# pairwise matrix (see 'pairwise.py')
+# pyright: strict
+#
+# copeland     a point per head-to-head win, and 1/2 (or nothing) per tie - most wins
+# minimax      each candidate's worst head-to-head, fewest against wins:
+#   winning votes         votes for the opponent in the worst loss (0 if it never loses)
+#   margins               the worst margin against it (negative if it beats everyone)
+#   pairwise opposition   the most votes any opponent gets against it, won or lost
+#
+# usage (from 'schemes'): python -m common.variants [election files...]
+# prints every variant's winners for each file
+
+import argparse
+from typing import Callable, Hashable, NamedTuple, Sequence
+
+from .types import Ballot, Result
+from .profile import candidates_of
+from .pairwise import pairwise_matrix
+
+
+class Variant(NamedTuple):
+    scores: list[float]  # one per candidate, in the order the candidates were given
+    winners: list[Hashable]
+
+    def result(self) -> Result:
+        return (self.winners[0], len(self.winners) == 1) if self.winners else (None, False)
+
+
+# copeland scores - 'tie' is what a tied head-to-head is worth to each side
+def copeland_scores(votes: list[list[int]], tie: float = 0.5) -> list[float]:
+    size: int = len(votes)
+    scores: list[float] = [0.0] * size
+    for i in range(size):
+        for j in range(size):
+            if votes[i][j] > votes[j][i]:
+                scores[i] += 1.0
+            elif votes[i][j] == votes[j][i] and j != i:
+                scores[i] += tie
+    return scores
+
+
+def winning_votes(votes: list[list[int]], i: int, j: int) -> float:
+    return votes[j][i] if votes[j][i] > votes[i][j] else 0
+
+
+def margins(votes: list[list[int]], i: int, j: int) -> float:
+    return votes[j][i] - votes[i][j]
+
+
+def pairwise_opposition(votes: list[list[int]], i: int, j: int) -> float:
+    return votes[j][i]
+
+
+# how badly 'j' beats 'i', per minimax variant
+OPPOSITION: dict[str, Callable[[list[list[int]], int, int], float]] = {
+    "winning votes": winning_votes,
+    "margins": margins,
+    "pairwise opposition": pairwise_opposition,
+}
+
+
+# minimax scores - each candidate's worst head-to-head by 'kind' (see 'OPPOSITION')
+def minimax_scores(votes: list[list[int]], kind: str = "winning votes") -> list[float]:
+    opposition: Callable[[list[list[int]], int, int], float] = OPPOSITION[kind]
+    size: int = len(votes)
+    return [
+        max((opposition(votes, i, j) for j in range(size) if j != i), default=0)
+        for i in range(size)
+    ]
+
+
+def best(candidates: Sequence[Hashable], scores: list[float], highest: bool) -> Variant:
+    if not scores:
+        return Variant(scores, [])
+    target: float = max(scores) if highest else min(scores)
+    return Variant(scores, [c for c, score in zip(candidates, scores) if score == target])
+
+
+# every variant from one matrix - keyed by the name the GUI shows
+def from_matrix(candidates: Sequence[Hashable], votes: list[list[int]]) -> dict[str, Variant]:
+    variants: dict[str, Variant] = {
+        "Copeland (1, 1/2)": best(candidates, copeland_scores(votes, 0.5), True),
+        "Copeland (1, 0)": best(candidates, copeland_scores(votes, 0.0), True),
+    }
+    for kind in OPPOSITION:
+        variants[f"Minimax ({kind})"] = best(candidates, minimax_scores(votes, kind), False)
+    return variants
+
+
+# every variant for 'ballots' - the matrix is built (or found in the memo) once
+def variants(ballots: Sequence[Ballot]) -> dict[str, Variant]:
+    candidates: list[Hashable] = list(candidates_of(ballots))
+    return from_matrix(candidates, pairwise_matrix(ballots, candidates))
+
+
+def main():
+    from .utility import load_election  # here, since 'utility' is only needed to print
+    from .profile import BallotProfile
+
+    parser = argparse.ArgumentParser(description="every copeland and minimax variant")
+    parser.add_argument("files", nargs="+", help="election files (JSON or binary)")
+    args = parser.parse_args()
+
+    for fname in args.files:
+        profile: BallotProfile = BallotProfile.of(load_election(fname, profile=True).ballots)
+        print(f"{fname}:")
+        for name, variant in variants(profile.ballots()).items():
+            names: list[Hashable] = [profile.name(c) for c in variant.winners]
+            print(f"  {name}: {names[0] if len(names) == 1 else names}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+# NumPy builders for the pairwise and rank count matrices (see 'pairwise.py')
+# pyright: strict
+#
+# numpy is optional - 'pairwise.py' only uses this module when it imports. results are
+# returned as lists of python ints, so they match the pure python builders exactly.
+#
+# ballots are flattened to (ids, offsets, tallies) arrays - straight from the profile's
+# arrays when the ballots still match it, otherwise built from the rankings. each ballot's
+# ranked pairs are expanded with 'np.repeat' over positions and counted with 'np.bincount'
+
+from typing import Any, Hashable, Sequence
+
+import numpy as np
+
+from .types import Ballot
+from .profile import BallotProfile, CandidateBallots, ranked_ids
+from . import budget
+
+
+# (ids, offsets, tallies) with ids as indices into 'candidates'. with 'unique', a candidate
+# ranked twice counts once (see 'profile.ranked_ids'), otherwise rankings are as cast
+def flatten(
+    ballots: Sequence[Ballot], candidates: Sequence[Hashable], unique: bool = True
+) -> tuple[Any, Any, Any]:
+    profile: BallotProfile | None = (
+        ballots.profile if isinstance(ballots, CandidateBallots) else None
+    )
+    if profile is not None:
+        flat: tuple[Any, Any, Any] | None = profile_arrays(profile, candidates, unique)
+        if flat is not None:
+            return flat
+
+    index: dict[Hashable, int] = {c: i for i, c in enumerate(candidates)}
+    ids: list[int] = []
+    offsets: list[int] = [0]
+    for ballot in ballots:
+        if unique:
+            ids.extend(ranked_ids(ballot, index))
+        else:
+            ids.extend(index[c] for c in ballot.ranking)
+        offsets.append(len(ids))
+
+    return (
+        np.array(ids, dtype=np.int64),
+        np.array(offsets, dtype=np.int64),
+        np.array([ballot.tally for ballot in ballots], dtype=np.int64),
+    )
+
+
+# the profile's own arrays, renumbered - 'None' if they can't be used as they are
+def profile_arrays(
+    profile: BallotProfile, candidates: Sequence[Hashable], unique: bool
+) -> tuple[Any, Any, Any] | None:
+    size: int = len(profile.candidates)
+    ids: Any = np.asarray(profile.ids).astype(np.int64)
+    offsets: Any = np.asarray(profile.offsets).astype(np.int64)
+    tallies: Any = np.asarray(profile.tallies).astype(np.int64)
+
+    if list(candidates) != list(range(size)):
+        renumber: Any = np.full(size, -1, dtype=np.int64)
+        for i, c in enumerate(candidates):
+            if not isinstance(c, int) or not 0 <= c < size:
+                return None
+            renumber[c] = i
+        ids = renumber[ids]
+        if (ids < 0).any():
+            return None  # a ranked candidate that isn't in 'candidates'
+
+    if unique:
+        ids, offsets = first_entries(ids, offsets, len(candidates))
+    return ids, offsets, tallies
+
+
+# drop all but the first of a candidate's entries on a ballot (see 'profile.ranked_ids')
+def first_entries(ids: Any, offsets: Any, size: int) -> tuple[Any, Any]:
+    ballots: int = len(offsets) - 1
+    ballot: Any = np.repeat(np.arange(ballots), np.diff(offsets))
+    order: Any = np.argsort(ballot * size + ids, kind="stable")
+    repeated: Any = np.diff((ballot * size + ids)[order]) == 0
+    if not repeated.any():
+        return ids, offsets
+
+    keep: Any = np.ones(ids.size, dtype=bool)
+    keep[order[1:][repeated]] = False  # an entry with an earlier one for the same candidate
+    lengths: Any = np.bincount(ballot[keep], minlength=ballots)
+    return ids[keep], np.concatenate(([0], np.cumsum(lengths)))
+
+
+# weighted counts of 'keys' - counted as if every weight were 1, then corrected for the
+# few ballots with other tallies (integer counting is much faster than weighted)
+def count(keys: Any, weights: Any, length: int) -> Any:
+    counts: Any = np.bincount(keys, minlength=length).astype(np.int64)
+    heavy: Any = weights != 1
+    if heavy.any():
+        extra: Any = np.bincount(keys[heavy], weights=weights[heavy] - 1, minlength=length)
+        counts += np.rint(extra).astype(np.int64)
+    return counts
+
+
+# index type for the flattened arrays - int32 halves the memory traffic while
+# every (row, column) key still fits
+def index_type(size: int) -> Any:
+    return np.int32 if size * size < 2**31 else np.int64
+
+
+# keys 'c * size + d' of every ranked pair (d above c) on the flattened ballots
+def pair_keys(ids: Any, offsets: Any, size: int) -> Any:
+    dtype: Any = index_type(size)
+    ids, offsets = ids.astype(dtype), offsets.astype(dtype)
+    lengths: Any = np.diff(offsets)
+
+    # each entry loses to the 'position' entries ranked above it on its ballot
+    entries: Any = np.arange(ids.size, dtype=dtype)
+    positions: Any = entries - np.repeat(offsets[:-1], lengths)
+    starts: Any = np.cumsum(positions, dtype=dtype) - positions
+    above: Any = np.arange(int(positions.sum()), dtype=dtype)
+    above -= np.repeat(starts - entries + positions, positions)
+
+    keys: Any = np.repeat(ids * size, positions)
+    keys += ids[above]
+    return keys
+
+
+def pairwise_matrix(
+    ballots: Sequence[Ballot], candidates: Sequence[Hashable]
+) -> list[list[int]]:
+    size: int = len(candidates)
+    ids, offsets, tallies = flatten(ballots, candidates)
+    lengths: Any = np.diff(offsets)
+    mentions: Any = count(ids, np.repeat(tallies, lengths), size)
+
+    # 'behind[c][d]' - votes ranking d above c. pairs are counted once per ballot, then
+    # again for the few ballots whose tally isn't 1
+    behind: Any = np.bincount(pair_keys(ids, offsets, size), minlength=size * size)
+    heavy: Any = np.flatnonzero(tallies != 1)
+    if heavy.size:
+        entries: Any = np.flatnonzero(np.repeat(tallies != 1, lengths))  # their rankings
+        lengths = lengths[heavy]
+        keys: Any = pair_keys(
+            ids[entries], np.concatenate(([0], np.cumsum(lengths))), size
+        )
+        weights: Any = np.repeat(tallies[heavy] - 1, lengths * (lengths - 1) // 2)
+        extra: Any = np.bincount(keys, weights=weights, minlength=size * size)
+        behind = behind + np.rint(extra).astype(np.int64)
+
+    matrix: Any = mentions[:, np.newaxis] - behind.reshape(size, size)
+    np.fill_diagonal(matrix, 0)
+    return matrix.tolist()
+
+
+# strongest paths over 'defeats' (see 'tournament.strongest_paths') - one whole-matrix
+# max-min update per intermediate candidate
+def strongest_paths(defeats: list[list[int]]) -> list[list[int]]:
+    paths: Any = np.array(defeats, dtype=np.int64).reshape(len(defeats), len(defeats))
+    for k in range(len(paths)):
+        np.maximum(paths, np.minimum(paths[:, k, np.newaxis], paths[k]), out=paths)
+    np.fill_diagonal(paths, 0)
+    return paths.tolist()
+
+
+# masks of the same size are scored a block at a time
+KEMENY_BLOCK: int = 1 << 16
+
+
+# kemeny-young table over every subset of candidates (see 'kemeny.py') - 'best[S]' is the
+# best score of ranking the candidates in bitmask S among themselves, and 'ways[S]' how many
+# rankings of S reach it (counted up to 2). a subset is scored from every way of putting one
+# of its candidates last, once every smaller subset is done
+def kemeny_table(votes: list[list[int]]) -> tuple[list[int], list[int]]:
+    size: int = len(votes)
+    matrix: Any = np.array(votes, dtype=np.float64).reshape(size, size)
+    np.fill_diagonal(matrix, 0)
+    masks: Any = np.arange(1 << size, dtype=np.int64)
+    members: Any = np.zeros(masks.size, dtype=np.uint8)
+    for c in range(size):
+        members += ((masks >> c) & 1).astype(np.uint8)
+
+    best: Any = np.zeros(masks.size, dtype=np.float64)
+    ways: Any = np.zeros(masks.size, dtype=np.uint8)
+    ways[0] = 1
+    for k in range(1, size + 1):
+        layer: Any = masks[members == k]
+        for start in range(0, layer.size, KEMENY_BLOCK):
+            subsets: Any = layer[start : start + KEMENY_BLOCK]
+            budget.check(subsets.size * size)
+            bits: Any = ((subsets[:, np.newaxis] >> np.arange(size)) & 1).astype(np.float64)
+            # 'behind[s][c]' - votes for the rest of subset s over c, if c comes last
+            behind: Any = bits @ matrix
+
+            top: Any = np.full(subsets.size, -np.inf)
+            reached: Any = np.zeros(subsets.size, dtype=np.uint8)
+            for c in range(size):
+                rest: Any = subsets ^ (1 << c)
+                score: Any = np.where(bits[:, c] > 0, best[rest] + behind[:, c], -np.inf)
+                ties: Any = np.minimum(reached + ways[rest], 2).astype(np.uint8)
+                np.copyto(reached, ties, where=score == top)
+                np.copyto(reached, ways[rest], where=score > top)
+                top = np.maximum(top, score)
+            best[subsets] = top
+            ways[subsets] = reached
+
+    return best.astype(np.int64).tolist(), ways.tolist()
+
+
+# 'counts[c][k]' - votes ranking candidates[c] in position k, rankings taken as cast
+def rank_counts(
+    ballots: Sequence[Ballot], candidates: Sequence[Hashable]
+) -> list[list[int]]:
+    size: int = len(candidates)
+    ids, offsets, tallies = flatten(ballots, candidates, unique=False)
+    lengths: Any = np.diff(offsets)
+    longest: int = int(lengths.max()) if lengths.size else 0
+
+    positions: Any = np.arange(ids.size, dtype=np.int64) - np.repeat(offsets[:-1], lengths)
+    counts: Any = count(
+        ids * longest + positions, np.repeat(tallies, lengths), size * longest
+    )
+    return counts.reshape(size, longest).tolist()
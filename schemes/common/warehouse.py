@@ -0,0 +1,330 @@
+# Academy warehouse - ballots, candidates, films, nominees and results in one SQLite file
+# pyright: strict
+#
+# every table is keyed by (category, year), so a query is an indexed lookup instead of
+# parsing the ballot, scraping and winners files for the whole category. rankings are
+# stored per ballot as little-endian int32 candidate ids (see 'candidates').
+#
+# usage (from 'schemes'): python -m common.warehouse [--db file] [--results SCHEME ...]
+# imports '../academy-ballots' and '../academy-scraping', replacing what was there
+
+import os
+import sys
+import json
+import glob
+import sqlite3
+import argparse
+import importlib
+from array import array
+from contextlib import closing
+from typing import Any, Hashable, Iterator, NamedTuple
+
+from .types import Election, Result, Scheme
+from .profile import BallotProfile
+from .memo import memo
+from .binary import little_endian
+from .utility import read_election as read_election_file
+
+ROOT: str = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+WAREHOUSE: str = os.path.join(ROOT, "academy.db")
+BALLOTS_DIR: str = os.path.join(ROOT, "academy-ballots")
+SCRAPING_DIR: str = os.path.join(ROOT, "academy-scraping")
+SCHEMES_DIR: str = os.path.join(ROOT, "schemes")
+
+SCHEMA: str = """
+CREATE TABLE IF NOT EXISTS candidates (
+    category TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    id INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    PRIMARY KEY (category, year, id)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS ballots (
+    category TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    tally INTEGER NOT NULL,
+    ranking BLOB NOT NULL,
+    PRIMARY KEY (category, year, position)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS films (
+    category TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    title TEXT NOT NULL,
+    url TEXT,
+    average_rating REAL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (category, year, title)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS nominees (
+    category TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    title TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    winner INTEGER NOT NULL,
+    PRIMARY KEY (category, year, title)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS results (
+    category TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    scheme TEXT NOT NULL,
+    winner TEXT,
+    is_unique INTEGER NOT NULL,
+    PRIMARY KEY (category, year, scheme)
+) WITHOUT ROWID;
+"""
+
+
+# a scraped film - 'year' is the year of the ceremony it was nominated at, as 'write_films'
+# stores it, not its release year
+class Film(NamedTuple):
+    title: str
+    url: str | None
+    year: int
+    average_rating: float | None
+
+
+class Ceremony(NamedTuple):
+    winner: str | None
+    nominees: list[str]
+
+
+def connect(path: str = WAREHOUSE) -> sqlite3.Connection:
+    conn: sqlite3.Connection = sqlite3.connect(path)
+    conn.executescript(SCHEMA)
+    return conn
+
+
+## READING ##
+
+
+def read_election(conn: sqlite3.Connection, category: str, year: int) -> Election:
+    candidates: list[Hashable] = [
+        name
+        for (name,) in conn.execute(
+            "SELECT name FROM candidates WHERE category = ? AND year = ? ORDER BY id",
+            (category, year),
+        )
+    ]
+    if not candidates:
+        raise KeyError(f"no {category} ballots for {year} in the warehouse")
+
+    offsets: array[int] = array("i", [0])
+    ids: array[int] = array("i")
+    tallies: array[int] = array("i")
+    for tally, ranking in conn.execute(
+        "SELECT tally, ranking FROM ballots WHERE category = ? AND year = ? ORDER BY position",
+        (category, year),
+    ):
+        ids.extend(from_little_endian(ranking))
+        offsets.append(len(ids))
+        tallies.append(tally)
+
+    return Election(BallotProfile(candidates, offsets, ids, tallies), {})
+
+
+def from_little_endian(blob: bytes) -> "array[int]":
+    values: array[int] = array("i", blob)
+    if sys.byteorder != "little":
+        values.byteswap()
+    return values
+
+
+def film(conn: sqlite3.Connection, category: str, year: int, title: str) -> Film | None:
+    row = conn.execute(
+        "SELECT title, url, year, average_rating FROM films "
+        "WHERE category = ? AND year = ? AND title = ?",
+        (category, year, title),
+    ).fetchone()
+    return None if row is None else Film(*row)
+
+
+def ceremony(conn: sqlite3.Connection, category: str, year: int) -> Ceremony:
+    winner: str | None = None
+    nominees: list[str] = []
+    for title, is_winner in conn.execute(
+        "SELECT title, winner FROM nominees WHERE category = ? AND year = ? ORDER BY position",
+        (category, year),
+    ):
+        nominees.append(title)
+        if is_winner:
+            winner = title
+    return Ceremony(winner, nominees)
+
+
+# a previously computed result, or 'None' if this scheme hasn't been run on the election
+def result(conn: sqlite3.Connection, category: str, year: int, scheme: str) -> Result | None:
+    row = conn.execute(
+        "SELECT winner, is_unique FROM results WHERE category = ? AND year = ? AND scheme = ?",
+        (category, year, scheme),
+    ).fetchone()
+    return None if row is None else (row[0], bool(row[1]))
+
+
+## WRITING ##
+
+
+def write_election(conn: sqlite3.Connection, category: str, year: int, election: Election):
+    profile: BallotProfile = BallotProfile.of(election.ballots)
+    conn.execute("DELETE FROM candidates WHERE category = ? AND year = ?", (category, year))
+    conn.execute("DELETE FROM ballots WHERE category = ? AND year = ?", (category, year))
+    conn.execute("DELETE FROM results WHERE category = ? AND year = ?", (category, year))
+
+    conn.executemany(
+        "INSERT INTO candidates VALUES (?, ?, ?, ?)",
+        ((category, year, i, name) for i, name in enumerate(profile.candidates)),
+    )
+    conn.executemany(
+        "INSERT INTO ballots VALUES (?, ?, ?, ?, ?)",
+        (
+            (
+                category,
+                year,
+                i,
+                profile.tallies[i],
+                little_endian(array("i", profile.ranking(i))),
+            )
+            for i in range(len(profile))
+        ),
+    )
+
+
+def write_films(
+    conn: sqlite3.Connection, category: str, year: int, films: list[dict[str, Any]]
+):
+    conn.execute("DELETE FROM films WHERE category = ? AND year = ?", (category, year))
+    conn.executemany(
+        "INSERT OR REPLACE INTO films VALUES (?, ?, ?, ?, ?, ?)",
+        (
+            (
+                category,
+                year,
+                f["Film_title"],
+                f.get("url"),
+                f.get("Average_rating"),
+                json.dumps(f, ensure_ascii=False),
+            )
+            for f in films
+        ),
+    )
+
+
+def write_ceremonies(
+    conn: sqlite3.Connection, category: str, ceremonies: list[dict[str, Any]]
+):
+    conn.execute("DELETE FROM nominees WHERE category = ?", (category,))
+    for c in ceremonies:
+        conn.executemany(
+            "INSERT OR REPLACE INTO nominees VALUES (?, ?, ?, ?, ?)",
+            (
+                (category, int(c["year"]), title, i, title == c["winner"])
+                for i, title in enumerate(c["nominees"])
+            ),
+        )
+
+
+# stored as the scheme scripts print it - ties leave no winner
+def record_result(
+    conn: sqlite3.Connection, category: str, year: int, scheme: str, outcome: Result
+):
+    winner, unique = outcome
+    stored: str | None = str(winner) if unique and winner is not None else None
+    conn.execute(
+        "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?)",
+        (category, year, scheme, stored, unique),
+    )
+
+
+## IMPORTING ##
+
+
+# (category, year, path) of every '{YEAR}-{CATEGORY}-ballots.json' file
+def ballot_files(ballots_dir: str = BALLOTS_DIR) -> Iterator[tuple[str, int, str]]:
+    for path in sorted(glob.glob(os.path.join(ballots_dir, "*", "*-ballots.json"))):
+        category: str = os.path.basename(os.path.dirname(path))
+        year: str = os.path.basename(path).split("-", 1)[0]
+        if year.isdigit():
+            yield category, int(year), path
+
+
+# everything is imported in one transaction - a failed import leaves the old warehouse
+def import_academy(
+    conn: sqlite3.Connection, ballots_dir: str = BALLOTS_DIR, scraping_dir: str = SCRAPING_DIR
+) -> int:
+    imported: int = 0
+    with conn:
+        for category, year, path in ballot_files(ballots_dir):
+            with open(path, "r", encoding="utf-8") as f:
+                write_election(conn, category, year, read_election_file(f, profile=True))
+            imported += 1
+
+            scraped: str = os.path.join(scraping_dir, category, f"{year}-{category}.json")
+            if os.path.exists(scraped):
+                with open(scraped, "r", encoding="utf-8") as f:
+                    write_films(conn, category, year, json.load(f))
+
+        for path in sorted(glob.glob(os.path.join(scraping_dir, "*", "oscar-winners-*.json"))):
+            category = os.path.basename(os.path.dirname(path))
+            with open(path, "r", encoding="utf-8") as f:
+                write_ceremonies(conn, category, json.load(f))
+
+    return imported
+
+
+# the named scheme modules in 'schemes'
+def load_schemes(names: list[str], schemes_dir: str = SCHEMES_DIR) -> dict[str, Scheme]:
+    if schemes_dir not in sys.path:
+        sys.path.insert(0, schemes_dir)
+    return {name: importlib.import_module(name).scheme for name in names}
+
+
+# run each scheme on every election, storing the results as each election finishes -
+# a scheme that fails on an election is reported and left without a result
+# (like a runtime error in the GUI). the schemes share each election's pairwise
+# statistics (see 'memo.py'), which are dropped once the election is done
+def compute_results(conn: sqlite3.Connection, schemes: dict[str, Scheme]) -> int:
+    computed: int = 0
+    elections: list[tuple[str, int]] = conn.execute(
+        "SELECT DISTINCT category, year FROM candidates ORDER BY category, year"
+    ).fetchall()
+    for category, year in elections:
+        election: Election = read_election(conn, category, year)
+        with conn:
+            for name, scheme in schemes.items():
+                try:
+                    outcome: Result = scheme(election.ballots)
+                except Exception as e:
+                    print(f"Error: {name} on {year} {category}: {e!r}")
+                    continue
+                record_result(conn, category, year, name, outcome)
+                computed += 1
+        memo.invalidate(BallotProfile.of(election.ballots))
+    return computed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="import the academy data into SQLite")
+    parser.add_argument("--db", type=str, default=WAREHOUSE, help="warehouse file")
+    parser.add_argument("--ballots", type=str, default=BALLOTS_DIR, help="ballots directory")
+    parser.add_argument("--scraping", type=str, default=SCRAPING_DIR, help="scraping directory")
+    parser.add_argument(
+        "--results",
+        nargs="+",
+        metavar="SCHEME",
+        help="also run these schemes on every election (e.g. irv borda)",
+    )
+    args = parser.parse_args()
+
+    with closing(connect(args.db)) as conn:
+        print(f"{import_academy(conn, args.ballots, args.scraping)} elections -> {args.db}")
+        if args.results:
+            print(f"{compute_results(conn, load_schemes(args.results))} results computed")
+            print("shared statistics: {hits} hits, {misses} misses".format(**memo.stats()))
+
+
+if __name__ == "__main__":
+    main()
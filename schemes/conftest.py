@@ -0,0 +1,2 @@
+# pytest from anywhere imports the schemes and 'common' the way the scripts do, from here
+# (usage: python -m pytest schemes)
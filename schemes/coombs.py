@@ -6,16 +6,8 @@ from typing import Hashable
 
 from common.types import Ballot, Result, Scheme
 from common.shared_main import shared_main
-
-
-# get all candidates
-def total_candidates(ballots: list[Ballot]) -> list[Hashable]:
-    candidates_set: set[Hashable] = set()
-    for ballot in ballots:
-        for candidate in ballot.ranking:
-            candidates_set.add(candidate)
-
-    return list(candidates_set)
+from common import budget
+from common.profile import interned, CandidateBallots, candidates_of, remove_candidate
 
 
 # count all votes - make sure those that have zero are counted too
@@ -48,16 +40,7 @@ def count_votes(
 def remove_loser(
     candidates: list[Hashable], ballots: list[Ballot], loser: Hashable
 ) -> list[Ballot]:
-    new_ballots: list[Ballot] = []
-    for ballot in ballots:
-        if loser in ballot.ranking:
-            temporary: list[Hashable] = list(ballot.ranking)
-            temporary.remove(loser)
-            if len(temporary) != 0:
-                new_ballot: Ballot = Ballot(tuple(temporary), ballot.tally)
-                new_ballots.append(new_ballot)
-        else:
-            new_ballots.append(ballot)
+    new_ballots: CandidateBallots = remove_candidate(ballots, loser)
 
     candidates.remove(loser)
     return new_ballots
@@ -65,12 +48,15 @@ def remove_loser(
 
 # coombs - irv but remove those with highest last place votes
 def coombs(ballots: list[Ballot]) -> Result:
-    candidates: list[Hashable] = total_candidates(ballots)
+    candidates: list[Hashable] = list(candidates_of(ballots))
 
     winners: list[Hashable]
     losers: list[Hashable]
 
+    rounds: int = 0
     while True:
+        rounds += 1
+        budget.check(progress=f"round {rounds}")
         total_votes: int = sum(ballot.tally for ballot in ballots)
         majority: float = total_votes * 0.5
         first: defaultdict[Hashable, float] = count_votes(candidates, ballots, 0)
@@ -98,7 +84,7 @@ def coombs(ballots: list[Ballot]) -> Result:
     return winners[0], len(winners) == 1
 
 
-scheme: Scheme = coombs
+scheme: Scheme = interned(coombs)
 name: str = "Coombs Method"
 
 
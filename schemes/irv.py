@@ -6,16 +6,7 @@ from typing import Hashable
 
 from common.types import Ballot, Result, Scheme
 from common.shared_main import shared_main
-
-
-# get all candidates
-def total_candidates(ballots: list[Ballot]) -> list[Hashable]:
-    candidates_set: set[Hashable] = set()
-    for ballot in ballots:
-        for candidate in ballot.ranking:
-            candidates_set.add(candidate)
-
-    return list(candidates_set)
+from common.profile import interned, CandidateBallots, candidates_of, remove_candidate
 
 
 # count all votes - make sure those that have zero are counted too
@@ -36,23 +27,13 @@ def count_votes(candidates: list[Hashable], ballots: list[Ballot]) -> Counter[Ha
 def remove_loser(
     candidates: list[Hashable], ballots: list[Ballot], loser: Hashable
 ) -> list[Ballot]:
-    new_ballots: list[Ballot] = []
-    for ballot in ballots:
-        if loser in ballot.ranking:
-            temporary: list[Hashable] = list(ballot.ranking)
-            temporary.remove(loser)
-            if len(temporary) != 0:
-                new_ballot: Ballot = Ballot(tuple(temporary), ballot.tally)
-                new_ballots.append(new_ballot)
-        else:
-            new_ballots.append(ballot)
-
+    new_ballots: CandidateBallots = remove_candidate(ballots, loser, merge=True)
     candidates.remove(loser)
     return new_ballots
 
 
 def irv(ballots: list[Ballot]) -> Result:
-    candidates: list[Hashable] = total_candidates(ballots)
+    candidates: list[Hashable] = list(candidates_of(ballots))
 
     winners: list[Hashable]
     losers: list[Hashable]
@@ -82,7 +63,7 @@ def irv(ballots: list[Ballot]) -> Result:
     return winners[0], len(winners) == 1
 
 
-scheme: Scheme = irv
+scheme: Scheme = interned(irv)
 name: str = "IRV"
 
 
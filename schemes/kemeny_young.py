@@ -1,114 +1,47 @@
 # Kemeny Young - implemented by Jonathan Houge
 # pyright: strict
+#
+# the ranking that agrees with the most head-to-head votes wins, solved exactly (see
+# 'common/kemeny.py') - only the top strongly connected component of the majority graph can
+# win, so only it is ranked. the winner is unique when every optimal ranking starts with it
+#
+# a top component too big to prove is ranked by local search for 'kemeny.seconds' - the
+# 'anytime' mode, the default - or refused in the 'exact' one (set with 'MRCV_KEMENY'). its
+# winner is the search's best guess, so it's never reported as unique
 
-from typing import Hashable, Iterator
-import itertools
+from typing import Hashable
 
 from common.types import Ballot, Result, Scheme
 from common.shared_main import shared_main
+from common.profile import interned, candidates_of
+from common.pairwise import pairwise_matrix
+from common.summary import ProfileSummary, SummaryScheme
+from common import kemeny
 
 
-# get all candidates
-def total_candidates(ballots: list[Ballot]) -> list[Hashable]:
-    candidates_set: set[Hashable] = set()
-    for ballot in ballots:
-        for candidate in ballot.ranking:
-            candidates_set.add(candidate)
-
-    return list(candidates_set)
-
-
-# initialize pairwise comparison matrix with 0 in every entry
-def matrix_creation(candidates: list[Hashable]) -> list[list[int]]:
-    matrix: list[list[int]] = []
-    for _ in range(0, len(candidates)):
-        row: list[int] = []
-        for _ in range(0, len(candidates)):
-            row.append(0)
-        matrix.append(row)
-
-    return matrix
-
-
-# create summary matrix (used whenever a condorcet matrix is needed to be made)
-def summary_matrix_generator(
-    ballots: list[Ballot], candidates: list[Hashable]
-) -> list[list[int]]:
-    matrix: list[list[int]] = matrix_creation(candidates)
-
-    combinations: Iterator[tuple[Hashable, ...]] = itertools.combinations(candidates, 2)
-    for combination in combinations:
-        votes: list[int] = [0, 0]
-        for ballot in ballots:
-            c1_present: int = ballot.ranking.count(combination[0])
-            c2_present: int = ballot.ranking.count(combination[1])
-
-            if c1_present and not c2_present:
-                votes[0] += ballot.tally
-            elif not c1_present and c2_present:
-                votes[1] += ballot.tally
-            elif c1_present and c2_present:
-                c1_position: int = ballot.ranking.index(combination[0])
-                c2_position: int = ballot.ranking.index(combination[1])
-                if c1_position < c2_position:
-                    votes[0] += ballot.tally
-                elif c1_position > c2_position:
-                    votes[1] += ballot.tally
-
-        c1: int = candidates.index(combination[0])
-        c2: int = candidates.index(combination[1])
-
-        matrix[c1][c2] = votes[0]
-        matrix[c2][c1] = votes[1]
-
-    return matrix
-
-
-# evaluate summary matrix, return winner of the best permutation
-def summary_matrix_resolver(
-    matrix: list[list[int]], candidates: list[Hashable]
-) -> Hashable:
-    winner: Hashable = -1
-    winning_score: int = 0
-    permutations: list[tuple[Hashable, ...]] = list(itertools.permutations(candidates))
-
-    for permutation in permutations:
-        current_score: int = 0
-        i: int = 1
-        for prefer in permutation[: len(permutation) - 1]:
-            for over in permutation[i:]:
-                prefer_index: int = candidates.index(prefer)
-                over_index: int = candidates.index(over)
-                current_score += matrix[prefer_index][over_index]
-            i += 1
-
-        # either we have a new winner or two candidates are tying
-        if current_score > winning_score:
-            winning_score = current_score
-            winner = permutation[0]
-        elif current_score == winning_score and winner != permutation[0]:
-            winner = -1
+# kemeny_young main function
+def kemeny_young(ballots: list[Ballot]) -> Result:
+    candidates: list[Hashable] = list(candidates_of(ballots))
+    summary_matrix: list[list[int]] = pairwise_matrix(ballots, candidates)
+    return resolve(candidates, summary_matrix)
 
-    return winner
 
+# kemeny_young from the pairwise matrix alone
+def resolve(candidates: list[Hashable], summary_matrix: list[list[int]]) -> Result:
+    return kemeny.top(summary_matrix).result(candidates)
 
-# kemeny_young main function
-def kemeny_young(ballots: list[Ballot]) -> Result:
-    candidates: list[Hashable] = total_candidates(ballots)
-    summary_matrix: list[list[int]] = summary_matrix_generator(ballots, candidates)
-    winner: Hashable = summary_matrix_resolver(summary_matrix, candidates)
 
-    if winner == -1:
-        return None, False
-    return winner, True
+def kemeny_young_summary(summary: ProfileSummary) -> Result:
+    return resolve(summary.candidates, summary.pairwise)
 
 
-scheme: Scheme = kemeny_young
+scheme: Scheme = interned(kemeny_young)
+summary_scheme: SummaryScheme = kemeny_young_summary
 name: str = "Kemeny Young"
 
 
 def main() -> None:
-    print(shared_main("kemeny_young", scheme))
+    print(shared_main("kemeny_young", scheme, summary_scheme))
 
 
 if __name__ == "__main__":
@@ -1,206 +1,204 @@
 # River Algorithm - implemented by Jonathan Houge
-# i am not proud of this code
 # pyright: strict
+#
+# defeats are taken strongest margin first, and each becomes an arc unless its loser already
+# has one (single parent) or it would close a cycle (union-find) - the arcs form a tree and
+# its root wins. every smith set member beats everyone outside it, so outsiders always get a
+# parent and never decide which member is the root: only the smith set is run.
+#
+# tied margins are handled explicitly - a tied group whose legal arcs don't interfere is
+# added at once, otherwise every way of adding it is followed, and the winner is unique
+# only if they all end at the same single root. every forest followed, inside a group or
+# across them, counts against one 'WORK_LIMIT' - past it the winner is treated as tied
 
-import math
-from typing import Hashable, Iterator
 import itertools
-from collections import defaultdict
+from typing import Hashable, Iterator
 
 from common.types import Ballot, Result, Scheme
 from common.shared_main import shared_main
+from common import budget
+from common.profile import interned, candidates_of
+from common.pairwise import pairwise_matrix
+from common.summary import ProfileSummary, SummaryScheme
+from common.tournament import smith_set
 
+# forests followed before giving up on a unique winner (see 'possible_winners')
+WORK_LIMIT: int = 10000
 
-# get all candidates
-def total_candidates(ballots: list[Ballot]) -> list[Hashable]:
-    candidates_set: set[Hashable] = set()
-    for ballot in ballots:
-        for candidate in ballot.ranking:
-            candidates_set.add(candidate)
 
-    return list(candidates_set)
+class OutOfWork(Exception):
+    pass
 
 
-# initialize pairwise comparison matrix with 0 in every entry
-def matrix_creation(candidates: list[Hashable]) -> list[list[int]]:
-    matrix: list[list[int]] = []
-    for _ in range(0, len(candidates)):
-        row: list[int] = []
-        for _ in range(0, len(candidates)):
-            row.append(0)
-        matrix.append(row)
+# forests followed so far, shared by every tied group - each one is also checked against
+# the budget (see 'budget.py')
+class Work:
+    def __init__(self, limit: int) -> None:
+        self.limit: int = limit
+        self.done: int = 0
 
-    return matrix
+    # raises 'OutOfWork' once more than 'limit' forests have been followed
+    def spend(self) -> None:
+        self.done += 1
+        budget.check(progress=f"{self.done} forests followed")
+        if self.done > self.limit:
+            raise OutOfWork()
 
 
 # create symmetric matrix - no need to find pairwise if we just use that to find symmetric
-def symmetric_matrix_generation(ballots: list[Ballot]) -> list[list[int]]:
-    candidates: list[Hashable] = total_candidates(ballots)
-    matrix: list[list[int]] = matrix_creation(candidates)
-
-    combinations: Iterator[tuple[Hashable, ...]] = itertools.combinations(candidates, 2)
-    for combination in combinations:
-        votes: list[int] = [0, 0]
-        for ballot in ballots:
-
-            c1_present: int = ballot.ranking.count(combination[0])
-            c2_present: int = ballot.ranking.count(combination[1])
-
-            if c1_present and not c2_present:
-                votes[0] += ballot.tally
-            elif not c1_present and c2_present:
-                votes[1] += ballot.tally
-            elif c1_present and c2_present:
-                c1_position: int = ballot.ranking.index(combination[0])
-                c2_position: int = ballot.ranking.index(combination[1])
-                if c1_position < c2_position:
-                    votes[0] += ballot.tally
-                elif c1_position > c2_position:
-                    votes[1] += ballot.tally
-
-        c1: int = candidates.index(combination[0])
-        c2: int = candidates.index(combination[1])
-
-        matrix[c1][c2] = votes[0] - votes[1]
-        matrix[c2][c1] = votes[1] - votes[0]
+def symmetric_matrix_generation(votes: list[list[int]]) -> list[list[int]]:
+    size: int = len(votes)
+    matrix: list[list[int]] = [
+        [votes[i][j] - votes[j][i] for j in range(size)] for i in range(size)
+    ]
 
     return matrix
 
 
-# multiple potential arcs found - if there are two legal ones, it's a tie.
-# returns the singular legal arc if there is one, -1 if there's a tie, and -2 if all were illegal.
-def multiple_arcs(
-    matrix: list[list[int]],
-    graph: defaultdict[int, list[int]],
-    highest: int,
-    lowest: int,
-    results: list[int],
-) -> int:
-    legal: int = -2
-
-    for i in range(0, len(results)):
-        result: int = results[i]
-        if result == 0:
-            continue
-
-        row: list[int] = matrix[i]
-        arcs: list[int] = [i for i in range(len(row)) if row[i] == highest]
-
-        for arc in arcs:
-            legality: bool = legality_check(graph, arc, i)
-            if legality and legal == -2:
-                legal = i
-            elif legality:
-                return -1
-            else:
-                matrix[i][arc] = lowest - 1
-
-    return legal
-
-
-# check arc legality - no cycles, single parent
-def legality_check(
-    directed_graph: defaultdict[int, list[int]], lost: int, won: int
-) -> bool:
-    possibleCycle: int = 0
-    for key, values in directed_graph.items():
-        for value in values:
-            if lost == value:
-                return False
-            elif won == value:
-                possibleCycle += 1
-        if lost == key:
-            possibleCycle += 1
-
-    if possibleCycle > 2:
-        return False
-    return True
-
-
-def handle_winner(
-    root: int, won: int, lost: int, directed_graph: defaultdict[int, list[int]]
-) -> int:
-    if root == -1:
-        root = won
-    elif lost == root:
-        root = won
-
-    if won in directed_graph:
-        directed_graph[won].append(lost)
-    else:
-        directed_graph[won] = [lost]
-
-    return root
-
-
-# find the highest symmetry, put in the graph, repeat
-# end if a legal arc tie is found, all possible arcs are found, zero is the
-# highest found value, or all estimated positives have been explored
-def directed_graph(symmetric_matrix: list[list[int]]) -> int:
-    root: int = -1
-    num_cans: int = len(symmetric_matrix[0])
-    directed_graph: defaultdict[int, list[int]] = defaultdict()
-    arc_count: int = 0
-
-    lowest: int = min(list(min(row) for row in symmetric_matrix))
-    max_positive_values: int = math.ceil((num_cans * num_cans) / 2)
-    for _ in range(0, max_positive_values):
-        highest: int = max(list(max(row) for row in symmetric_matrix))
-
-        if highest == lowest - 1:
+# arcs added so far - how many parents each candidate has, and union-find over the trees
+class Forest:
+    def __init__(self, size: int) -> None:
+        self.indegree: list[int] = [0] * size
+        self.parent: list[int] = list(range(size))
+        self.arcs: int = 0
+
+    def copy(self) -> "Forest":
+        forest: Forest = Forest(0)
+        forest.indegree = self.indegree[:]
+        forest.parent = self.parent[:]
+        forest.arcs = self.arcs
+        return forest
+
+    def find(self, node: int) -> int:
+        while self.parent[node] != node:
+            self.parent[node] = self.parent[self.parent[node]]
+            node = self.parent[node]
+        return node
+
+    # single parent, no cycles
+    def legal(self, won: int, lost: int) -> bool:
+        return self.indegree[lost] == 0 and self.find(won) != self.find(lost)
+
+    def add(self, won: int, lost: int) -> None:
+        self.indegree[lost] += 1
+        self.parent[self.find(lost)] = self.find(won)
+        self.arcs += 1
+
+    def roots(self) -> list[int]:
+        return [node for node, parents in enumerate(self.indegree) if parents == 0]
+
+    # forests that will grow the same way from here
+    def key(self) -> tuple[tuple[int, ...], tuple[int, ...]]:
+        trees: tuple[int, ...] = tuple(self.find(node) for node in range(len(self.parent)))
+        return tuple(self.indegree), trees
+
+
+# positive margins, strongest first, grouped by margin - one sort of every edge
+def tied_groups(margins: list[list[int]]) -> list[list[tuple[int, int]]]:
+    size: int = len(margins)
+    edges: list[tuple[int, int, int]] = sorted(
+        (-margins[i][j], i, j)
+        for i in range(size)
+        for j in range(size)
+        if margins[i][j] > 0
+    )
+    return [
+        [(won, lost) for _, won, lost in group]
+        for _, group in itertools.groupby(edges, key=lambda edge: edge[0])
+    ]
+
+
+# every distinct forest a tied group can leave behind, whatever order its arcs come in
+def add_group(
+    forest: Forest,
+    group: list[tuple[int, int]],
+    seen: set[frozenset[tuple[int, int]]],
+    work: Work,
+    added: frozenset[tuple[int, int]] = frozenset(),
+) -> Iterator[Forest]:
+    work.spend()
+    legal: list[tuple[int, int]] = [arc for arc in group if forest.legal(*arc)]
+
+    # no two legal arcs share a loser or close a cycle together - any order gives this
+    together: Forest = forest.copy()
+    for arc in legal:
+        if not together.legal(*arc):
             break
+        together.add(*arc)
+    else:
+        if added | frozenset(legal) not in seen:
+            seen.add(added | frozenset(legal))
+            yield together
+        return
+
+    for arc in legal:
+        branch: Forest = forest.copy()
+        branch.add(*arc)
+        rest: list[tuple[int, int]] = [other for other in legal if other != arc]
+        yield from add_group(branch, rest, seen, work, added | {arc})
+
+
+# the roots river can end at ('None' for a forest with several roots) - stops at two, or
+# adds 'None' once 'limit' forests have been followed (then it's treated as a tie)
+def possible_winners(margins: list[list[int]], limit: int = WORK_LIMIT) -> set[int | None]:
+    groups: list[list[tuple[int, int]]] = tied_groups(margins)
+    winners: set[int | None] = set()
+    explored: set[tuple[int, tuple[tuple[int, ...], tuple[int, ...]]]] = set()
+    work: Work = Work(limit)
+
+    def explore(forest: Forest, g: int) -> None:
+        if forest.arcs == len(margins) - 1 or g == len(groups):
+            roots: list[int] = forest.roots()
+            winners.add(roots[0] if len(roots) == 1 else None)
+            return
+
+        state: tuple[int, tuple[tuple[int, ...], tuple[int, ...]]] = (g, forest.key())
+        if state in explored:
+            return
+        explored.add(state)
+
+        for grown in add_group(forest, groups[g], set(), work):
+            explore(grown, g + 1)
+            if len(winners) > 1:
+                return
+
+    try:
+        explore(Forest(len(margins)), 0)
+    except OutOfWork:
+        winners.add(None)
+    return winners
 
-        won: int
-        results: list[int] = list(row.count(highest) for row in symmetric_matrix)
-        if sum(results) > 1 or results.count(1) > 1:
-            if root == -1:
-                break  # legal arc tie - we're done
-
-            won = multiple_arcs(
-                symmetric_matrix, directed_graph, highest, lowest, results
-            )
-
-            if won == -1:
-                root = -1  # legal arc tie - we're done
-                break
-            elif won == -2:
-                continue  # all arcs were illegal - let's check out the next ones
-        else:
-            won = results.index(1)
-
-        lost: int = symmetric_matrix[won].index(highest)
-        symmetric_matrix[won][lost] = lowest - 1
-
-        if not legality_check(directed_graph, lost, won):
-            continue  # illegal arc
-
-        root = handle_winner(root, won, lost, directed_graph)
 
-        arc_count += 1
-        if arc_count == num_cans - 1:
-            break  # all arcs found - end
+def river(ballots: list[Ballot]) -> Result:
+    candidates: list[Hashable] = list(candidates_of(ballots))
+    return resolve(candidates, pairwise_matrix(ballots, candidates))
 
-    return root
 
+# river from the pairwise matrix alone
+def resolve(candidates: list[Hashable], votes: list[list[int]]) -> Result:
+    members: list[int] = smith_set(votes)
+    margins: list[list[int]] = symmetric_matrix_generation(
+        [[votes[i][j] for j in members] for i in members]
+    )
+    winners: set[int | None] = possible_winners(margins)
 
-def river(ballots: list[Ballot]) -> Result:
-    symmetric_matrix: list[list[int]] = symmetric_matrix_generation(ballots)
-    winner_index: int = directed_graph(symmetric_matrix)
+    winner: int | None = winners.pop() if len(winners) == 1 else None  # several: a tie
+    if winner is None:
+        return None, False
+    return candidates[members[winner]], True
 
-    # -1 if no winner (tie), otherwise grab it
-    winner: Hashable = (
-        None if winner_index == -1 else total_candidates(ballots)[winner_index]
-    )
 
-    return winner, winner is not None
+def river_summary(summary: ProfileSummary) -> Result:
+    return resolve(summary.candidates, summary.pairwise)
 
 
-scheme: Scheme = river
+scheme: Scheme = interned(river)
+summary_scheme: SummaryScheme = river_summary
 name: str = "River"
 
 
 def main() -> None:
-    print(shared_main("river", scheme))
+    print(shared_main("river", scheme, summary_scheme))
 
 
 if __name__ == "__main__":
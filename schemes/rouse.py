@@ -2,44 +2,43 @@
 # pyright: strict
 
 from collections import defaultdict
-from typing import Hashable
+from typing import Hashable, Mapping
 
 from common.types import Ballot, Result, Scheme
 from common.shared_main import shared_main
-
-
-# get all candidates
-def total_candidates(ballots: list[Ballot]) -> list[Hashable]:
-    candidates_set: set[Hashable] = set()
-    for ballot in ballots:
-        for candidate in ballot.ranking:
-            candidates_set.add(candidate)
-
-    return list(candidates_set)
+from common import budget
+from common.profile import (
+    interned,
+    CandidateBallots,
+    candidates_of,
+    remove_candidate,
+    rank_positions,
+)
 
 
 # todd's borda - modified to be the 'average' method
 def borda(ballots: list[Ballot]) -> list[Hashable]:
     unmentioned_candidates: list[Hashable]
-    size: int = len(set(c for ballot in ballots for c in ballot.ranking))
+    candidates: list[Hashable] = list(candidates_of(ballots))
+    size: int = len(candidates)
     points: list[int] = [c for c in range(size - 1, -1, -1)]
 
     scores: defaultdict[Hashable, float] = defaultdict()
-    for candidate in total_candidates(ballots):
+    for candidate in candidates:
         scores[candidate] = 0
 
     for ballot in ballots:
         if ballot.tally == 0:
             continue
 
-        unmentioned_candidates = total_candidates(ballots)
         unmentioned_index: int = 0
-
         for i, candidate in enumerate(ballot.ranking):
             scores[candidate] += points[i] * ballot.tally
-            unmentioned_candidates.remove(candidate)
             unmentioned_index = i
 
+        mentioned: Mapping[Hashable, int] = rank_positions(ballot)
+        unmentioned_candidates = [c for c in candidates if c not in mentioned]
+
         # divide remaining points equally amongst the unmentioned candidates
         if len(unmentioned_candidates) != 0:
             unmentioned_points: float = 0
@@ -61,35 +60,28 @@ def borda(ballots: list[Ballot]) -> list[Hashable]:
 
 # modified candidate removal from irv - remove candidate, either temporarily or permanently
 def remove_loser(ballots: list[Ballot], loser: Hashable) -> list[Ballot]:
-    new_ballots: list[Ballot] = []
-    for ballot in ballots:
-        if loser in ballot.ranking:
-            temporary: list[Hashable] = list(ballot.ranking)
-            temporary.remove(loser)
-
-            if len(temporary) != 0:
-                new_ballot: Ballot = Ballot(tuple(temporary), ballot.tally)
-                new_ballots.append(new_ballot)
-        else:
-            new_ballots.append(ballot)
+    new_ballots: CandidateBallots = remove_candidate(ballots, loser)
 
     return new_ballots
 
 
 # rouse's method main - call borda as long as more than one candidate exists
 def rouse(ballots: list[Ballot]) -> Result:
-    num_candidates: int = len(set(c for ballot in ballots for c in ballot.ranking))
+    num_candidates: int = len(candidates_of(ballots))
     bucket: list[Hashable]
 
     while num_candidates > 1:
         bucket = []
         temp_ballots: list[Ballot] = ballots.copy()
         while len(bucket) != num_candidates - 1:
+            budget.check(progress=f"{num_candidates} candidates left")
             bucket_candidate: list[Hashable] = borda(temp_ballots)
             if len(bucket_candidate) != 1:
                 return None, False  # more than one winner
 
-            # winner has immunity, remove them temporarily
+            # winner has immunity, remove them temporarily - the first is the best guess yet
+            if not bucket:
+                budget.note(best=bucket_candidate[0])
             bucket.append(bucket_candidate[0])
             temp_ballots = remove_loser(temp_ballots, bucket_candidate[0])
 
@@ -98,11 +90,11 @@ def rouse(ballots: list[Ballot]) -> Result:
 
         num_candidates -= 1
 
-    winners: list[Hashable] = list(set(c for ballot in ballots for c in ballot.ranking))
+    winners: list[Hashable] = list(candidates_of(ballots))
     return winners[0], len(winners) == 1
 
 
-scheme: Scheme = rouse
+scheme: Scheme = interned(rouse)
 name: str = "Rouse's Method"
 
 
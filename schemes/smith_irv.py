@@ -1,129 +1,15 @@
 # Woodall's Method / Smith IRV - implemented by Jonathan Houge
 # pyright: strict
 
-from typing import Hashable, Iterator
-from collections import defaultdict, Counter
-import itertools
+from typing import Hashable
+from collections import Counter
 
 from common.shared_main import shared_main
+from common.profile import interned, CandidateBallots, candidates_of, remove_candidate
+from common import pairwise
 from common.types import Ballot, Result, Scheme
 
 
-# my copeland - uses 'calculate_copeland', 'copeland_count_votes', 'get_index', and 'add_to_smith_set'
-# modified to calculate the full smith set - if no condorcet winner
-def copeland(ballots: list[Ballot]) -> list[Hashable]:
-    scores: defaultdict[Hashable, float] = defaultdict()
-    candidates: set[Hashable] = set()
-    for ballot in ballots:
-        for candidate in ballot.ranking:
-            candidates.add(candidate)
-            scores[candidate] = 0  # set before incrementing later
-
-    calculate_copeland(candidates, ballots, scores)
-
-    # code from 'borda.py'
-    max_score: float = max(scores.values())
-    winners: list[Hashable] = [
-        candidate for candidate, score in scores.items() if score == max_score
-    ]
-
-    # modification - redo copeland score for every smith set entry
-    if max_score != len(candidates) - 1:
-        i: int = 0
-        while i < len(winners):
-            calculate_copeland(candidates, ballots, scores, winners, i)
-            i += 1
-
-    return winners
-
-
-# modified calculate copeland score - optional arguments to complete smith set
-def calculate_copeland(
-    candidates: set[Hashable],
-    ballots: list[Ballot],
-    scores: defaultdict[Hashable, float],
-    smith_set: list[Hashable] = [],
-    smith_set_index: int = 0,
-) -> None:
-    combinations: Iterator[tuple[Hashable, ...]] = itertools.combinations(candidates, 2)
-    positions: list[int] = [0, 0]
-
-    # copeland - pairwise faceoffs to determine how a point is assigned
-    for combination in combinations:
-        votes: list[int] = [0, 0]
-
-        # only evaluate those that are going against the current smith_set index
-        if len(smith_set) != 0 and smith_set[smith_set_index] not in combination:
-            continue
-
-        copeland_count_votes(ballots, combination, positions, votes)
-
-        # copeland - majority vote gets 1, tie splits the 1
-        if votes[0] > votes[1]:
-            scores[combination[0]] += 1.0
-
-            add_to_smith_set(smith_set, combination[0])
-        elif votes[1] > votes[0]:
-            scores[combination[1]] += 1.0
-
-            add_to_smith_set(smith_set, combination[1])
-        elif votes[0] == votes[1]:
-            scores[combination[0]] += 0.5
-            scores[combination[1]] += 0.5
-
-            add_to_smith_set(smith_set, combination[0])
-            add_to_smith_set(smith_set, combination[1])
-
-
-# NEW - used when creating smith set
-def add_to_smith_set(smith_set: list[Hashable], candidate: Hashable) -> None:
-    if len(smith_set) == 0:
-        return
-    elif candidate not in smith_set:
-        smith_set.append(candidate)
-
-
-# calculate pairwise match-up
-def copeland_count_votes(
-    ballots: list[Ballot],
-    combination: tuple[Hashable, ...],
-    positions: list[int],
-    votes: list[int],
-) -> None:
-    for ballot in ballots:
-        positions[0] = get_index(ballot.ranking, combination[0])
-        positions[1] = get_index(ballot.ranking, combination[1])
-
-        if positions[0] >= 0 and (positions[1] == -1 or positions[0] < positions[1]):
-            votes[0] += ballot.tally
-        elif positions[1] >= 0 and (
-            (positions[0] == -1 or positions[1] < positions[0])
-        ):
-            votes[1] += ballot.tally
-
-
-# find candidate in ranking, return index position
-# '.index()', if not found, throws an error --> set to -1 (not found in other languages)
-def get_index(ranking: tuple[Hashable, ...], candidate: Hashable) -> int:
-    position: int
-    try:
-        position = ranking.index(candidate)
-    except ValueError:
-        position = -1
-
-    return position
-
-
-# get all candidates
-def total_candidates(ballots: list[Ballot]) -> list[Hashable]:
-    candidates_set: set[Hashable] = set()
-    for ballot in ballots:
-        for candidate in ballot.ranking:
-            candidates_set.add(candidate)
-
-    return list(candidates_set)
-
-
 # count all votes - make sure those that have zero are counted too
 def irv_count_votes(
     candidates: list[Hashable], ballots: list[Ballot]
@@ -142,24 +28,14 @@ def irv_count_votes(
 
 # remove irv loser from 'ballot.ranking'
 def remove_loser(ballots: list[Ballot], loser: Hashable) -> list[Ballot]:
-    new_ballots: list[Ballot] = []
-    for ballot in ballots:
-        if loser in ballot.ranking:
-            temporary: list[Hashable] = list(ballot.ranking)
-            temporary.remove(loser)
-            if len(temporary) != 0:
-                new_ballot: Ballot = Ballot(tuple(temporary), ballot.tally)
-                new_ballots.append(new_ballot)
-        else:
-            new_ballots.append(ballot)
-
+    new_ballots: CandidateBallots = remove_candidate(ballots, loser, merge=True)
     return new_ballots
 
 
-# my irv - uses 'remove_loser', 'irv_count_votes', and 'total_candidates'
+# my irv - uses 'remove_loser' and 'irv_count_votes'
 # modified to elect a candidate of the smith set
 def irv(ballots: list[Ballot], smith_set: list[Hashable]) -> Result:
-    candidates: list[Hashable] = total_candidates(ballots)
+    candidates: list[Hashable] = list(candidates_of(ballots))
 
     winners: list[Hashable]
     losers: list[Hashable]
@@ -191,16 +67,21 @@ def irv(ballots: list[Ballot], smith_set: list[Hashable]) -> Result:
     return smith_set[0], len(smith_set) == 1
 
 
-# main - calculate smith_set with copeland, run irv if needed
+# smith set of the remaining candidates (see 'tournament.py')
+def find_smith_set(ballots: list[Ballot]) -> list[Hashable]:
+    return pairwise.smith_set(ballots, list(candidates_of(ballots)))
+
+
+# main - calculate smith_set, run irv if needed
 def smith_irv(ballots: list[Ballot]) -> Result:
-    smith_set: list[Hashable] = copeland(ballots)
+    smith_set: list[Hashable] = find_smith_set(ballots)
     if len(smith_set) == 1:
         return smith_set[0], len(smith_set) == 1
 
     return irv(ballots, smith_set)
 
 
-scheme: Scheme = smith_irv
+scheme: Scheme = interned(smith_irv)
 name: str = "Smith IRV: Woodall's Method"
 
 
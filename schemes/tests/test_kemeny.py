@@ -0,0 +1,124 @@
+# Kemeny-Young solvers against a brute force over every ranking of up to 7 candidates
+# pyright: strict
+
+import itertools
+import random
+from typing import NamedTuple
+
+import pytest
+
+from common import kemeny, pairwise
+
+
+class Brute(NamedTuple):
+    score: int
+    unique: bool
+    winners: list[int]
+    orders: list[tuple[int, ...]]  # every optimal ranking
+
+
+def brute(votes: list[list[int]]) -> Brute:
+    size: int = len(votes)
+    best: int = -1
+    orders: list[tuple[int, ...]] = []
+    for order in itertools.permutations(range(size)):
+        total: int = sum(
+            votes[order[i]][order[j]] for i in range(size) for j in range(i + 1, size)
+        )
+        if total > best:
+            best, orders = total, [order]
+        elif total == best:
+            orders.append(order)
+    return Brute(best, len(orders) == 1, sorted({order[0] for order in orders}), orders)
+
+
+# random head-to-head counts - a small 'most' makes ties (and several optimal rankings) common
+def random_votes(rng: random.Random, size: int) -> list[list[int]]:
+    most: int = rng.choice([1, 3, 10])
+    return [[0 if i == j else rng.randint(0, most) for j in range(size)] for i in range(size)]
+
+
+def elections(seed: int, count: int, largest: int = 7) -> list[list[list[int]]]:
+    rng: random.Random = random.Random(seed)
+    return [random_votes(rng, rng.randint(1, largest)) for _ in range(count)]
+
+
+def check_exact(votes: list[list[int]], ranking: kemeny.Ranking) -> None:
+    expected: Brute = brute(votes)
+    assert (ranking.score, ranking.unique, ranking.winners) == (
+        expected.score,
+        expected.unique,
+        expected.winners,
+    ), votes
+    assert tuple(ranking.order) in expected.orders, votes
+    assert ranking.bound is None
+
+
+# numpy's table and the pure python one
+@pytest.mark.parametrize("backend", ["auto", "python"])
+def test_dynamic_programming(backend: str) -> None:
+    previous: str = pairwise.backend
+    pairwise.set_backend(backend)
+    try:
+        for votes in elections(21, 200):
+            check_exact(votes, kemeny.dynamic_programming(votes))
+    finally:
+        pairwise.set_backend(previous)
+
+
+def test_branch_and_bound() -> None:
+    for votes in elections(22, 200):
+        check_exact(votes, kemeny.branch_and_bound(votes))
+
+
+def test_solve() -> None:
+    for votes in elections(23, 200):
+        check_exact(votes, kemeny.solve(votes))
+
+
+# only the top component is ranked - its winners are everyone's
+def test_top() -> None:
+    for votes in elections(24, 200):
+        ranking: kemeny.Ranking = kemeny.top(votes)
+        expected: Brute = brute(votes)
+        assert ranking.winners == expected.winners, votes
+        assert ranking.result(list(range(len(votes)))) == (
+            expected.winners[0],
+            len(expected.winners) == 1,
+        ), votes
+
+
+def test_empty() -> None:
+    solvers = (kemeny.dynamic_programming, kemeny.branch_and_bound, kemeny.solve, kemeny.top)
+    for solver in solvers:
+        assert solver([]).result([]) == (None, False)
+
+
+# local search - a ranking of everyone, scored right, with the optimum between its score and
+# its bound, and never a unique winner
+@pytest.mark.parametrize("anneal", [False, True])
+def test_anytime(anneal: bool) -> None:
+    for votes in elections(25, 100):
+        ranking: kemeny.Ranking = kemeny.anytime(votes, 0.01, anneal)
+        optimum: int = brute(votes).score
+        assert sorted(ranking.order) == list(range(len(votes))), votes
+        assert ranking.score == kemeny.score(votes, ranking.order), votes
+        assert ranking.bound is not None and ranking.score <= optimum <= ranking.bound, votes
+        assert kemeny.upper_bound(votes) >= optimum, votes
+        assert not ranking.result(list(range(len(votes))))[1], votes
+
+
+# the integer program, when scipy is installed
+def test_integer_program() -> None:
+    pytest.importorskip("scipy")
+    from common import linear_ordering  # here, since it needs scipy
+
+    for votes in elections(26, 100):
+        solution: linear_ordering.Solution = linear_ordering.solve(votes, 10)
+        expected: Brute = brute(votes)
+        assert (solution.score, solution.unique, solution.winners) == (
+            expected.score,
+            expected.unique,
+            expected.winners,
+        ), votes
+        assert tuple(solution.order) in expected.orders, votes
@@ -0,0 +1,39 @@
+# remove_candidate keeps the ballots' cached candidates in step with their rankings
+# pyright: strict
+
+from typing import Hashable
+
+from common.types import Ballot
+from common.profile import CandidateBallots, remove_candidate
+
+
+def scanned(ballots: CandidateBallots) -> set[Hashable]:
+    return {c for ballot in ballots for c in ballot.ranking}
+
+
+# each removal takes one entry, so 'a' stays a candidate until its last entry goes
+def test_ranked_twice():
+    ballots: CandidateBallots = CandidateBallots(
+        [Ballot(("a", "b", "a"), 2), Ballot(("a", "a"), 1), Ballot(("b",), 3)]
+    )
+
+    once: CandidateBallots = remove_candidate(ballots, "a")
+    assert list(once) == [Ballot(("b", "a"), 2), Ballot(("a",), 1), Ballot(("b",), 3)]
+    assert once.candidates == scanned(once) == {"a", "b"}
+
+    twice: CandidateBallots = remove_candidate(once, "a")
+    assert list(twice) == [Ballot(("b",), 2), Ballot(("b",), 3)]
+    assert twice.candidates == scanned(twice) == {"b"}
+
+
+def test_merge():
+    ballots: list[Ballot] = [
+        Ballot(("a", "b"), 1),
+        Ballot(("c", "a", "b"), 2),
+        Ballot(("b", "a"), 4),
+        Ballot(("a", "c", "b"), 8),
+    ]
+
+    merged: CandidateBallots = remove_candidate(ballots, "c", merge=True)
+    assert list(merged) == [Ballot(("a", "b"), 11), Ballot(("b", "a"), 4)]
+    assert merged.candidates == {"a", "b"}
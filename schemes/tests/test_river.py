@@ -0,0 +1,96 @@
+# River against a brute force that adds each tied group's arcs in every order
+# pyright: strict
+
+import itertools
+import random
+
+from common.types import Ballot
+from common import budget
+from river import Forest, possible_winners, resolve, scheme, tied_groups
+
+
+# the root river ends at when each tied group's arcs come in the given orders
+def river_root(size: int, groups: list[list[tuple[int, int]]]) -> int | None:
+    forest: Forest = Forest(size)
+    for group in groups:
+        for won, lost in group:
+            if forest.legal(won, lost):
+                forest.add(won, lost)
+    roots: list[int] = forest.roots()
+    return roots[0] if len(roots) == 1 else None
+
+
+def brute_winners(margins: list[list[int]]) -> set[int | None]:
+    groups: list[list[tuple[int, int]]] = tied_groups(margins)
+    orders = itertools.product(*(itertools.permutations(group) for group in groups))
+    return {river_root(len(margins), [list(group) for group in order]) for order in orders}
+
+
+# up to 5 candidates, with no more than 7 margins tied (at most 7! orders per group)
+def random_margins(rng: random.Random) -> list[list[int]]:
+    size: int = rng.randint(1, 5)
+    spread: int = rng.choice([1, 2, 4]) if size < 5 else 4
+    while True:
+        margins: list[list[int]] = [[0] * size for _ in range(size)]
+        for i in range(size):
+            for j in range(i + 1, size):
+                margins[i][j] = rng.randint(-spread, spread)
+                margins[j][i] = -margins[i][j]
+        if all(len(group) <= 7 for group in tied_groups(margins)):
+            return margins
+
+
+def test_every_tie_order() -> None:
+    rng: random.Random = random.Random(18)
+    for _ in range(400):
+        margins: list[list[int]] = random_margins(rng)
+        expected: set[int | None] = brute_winners(margins)
+        found: set[int | None] = possible_winners(margins)
+        if len(expected) == 1:
+            assert found == expected, margins
+        else:
+            assert len(found) > 1 and found <= expected, margins
+
+
+def test_unique_only_without_a_contested_tie() -> None:
+    rng: random.Random = random.Random(81)
+    for _ in range(200):
+        margins: list[list[int]] = random_margins(rng)
+        size: int = len(margins)
+        votes: list[list[int]] = [
+            [max(margins[i][j], 0) for j in range(size)] for i in range(size)
+        ]
+        expected: set[int | None] = brute_winners(margins)
+        winner, unique = resolve(list(range(size)), votes)
+        assert unique == (len(expected) == 1 and None not in expected), margins
+        if unique:
+            assert {winner} == expected, margins
+
+
+def test_scheme() -> None:
+    ballots: list[Ballot] = [
+        Ballot(("a", "b", "c"), 3),
+        Ballot(("b", "c", "a"), 2),
+        Ballot(("c", "a", "b"), 2),
+    ]
+    assert scheme(ballots) == ("a", True)
+
+
+# few voters over many candidates - big tied groups whose orders conflict. the work limit
+# covers the orders inside a group too, so this is a quick tie rather than a hang
+def test_many_ties() -> None:
+    ballots: list[Ballot] = [
+        Ballot((3, 23, 18, 19, 10, 15, 4, 2, 9, 6, 22), 1),
+        Ballot((0, 2, 23, 6, 15, 3, 1, 7, 10, 19, 9, 18, 12, 8, 20, 13), 1),
+        Ballot((12, 0, 1, 13, 8, 6, 23, 7, 4, 9, 2, 18, 5, 3, 10, 15), 1),
+    ]
+    outcome: budget.Outcome = budget.run(lambda: scheme(ballots), budget.Budget(10))
+    assert outcome.complete
+    assert outcome.result == (None, False)
+
+
+# running out of work mid-group is a tie, never a made-up winner
+def test_work_limit() -> None:
+    margins: list[list[int]] = [[0, 1, -1], [-1, 0, 1], [1, -1, 0]]  # a cycle, all tied
+    assert len(brute_winners(margins)) > 1
+    assert None in possible_winners(margins, limit=1)
@@ -7,16 +7,7 @@ from typing import Hashable
 
 from common.types import Ballot, Result, Scheme
 from common.shared_main import shared_main
-
-
-# get all candidates
-def total_candidates(ballots: list[Ballot]) -> list[Hashable]:
-    candidates_set: set[Hashable] = set()
-    for ballot in ballots:
-        for candidate in ballot.ranking:
-            candidates_set.add(candidate)
-
-    return list(candidates_set)
+from common.profile import interned, candidates_of
 
 
 # get the ranks of all candidates
@@ -74,7 +65,7 @@ def typical_judgement(ranks: defaultdict[Hashable, list[float]]) -> list[Hashabl
 
 # main func - get cands & ranks, find max rank - if not unique, typical judgement
 def topmost_median_rank(ballots: list[Ballot]) -> Result:
-    candidates: list[Hashable] = total_candidates(ballots)
+    candidates: list[Hashable] = list(candidates_of(ballots))
     ranks: defaultdict[Hashable, list[float]] = calculate_ranks(ballots, candidates)
 
     max_median_rank: float | None = None
@@ -100,7 +91,7 @@ def topmost_median_rank(ballots: list[Ballot]) -> Result:
     return winners[0], len(winners) == 1
 
 
-scheme: Scheme = topmost_median_rank
+scheme: Scheme = interned(topmost_median_rank)
 name: str = "Topmost Median Rank"
 
 